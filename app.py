@@ -3,6 +3,10 @@ Energy Settlement Dashboard for Ghana Grid Company.
 
 Main application entry point that initializes the Dash app,
 defines the layout, and registers all callbacks.
+
+The app is built by `create_app` under the `__main__` guard: ingest worker
+processes re-import this module as `__mp_main__` and must not build the
+app or register the callbacks again.
 """
 
 from dash import Dash, dcc, html
@@ -19,21 +23,11 @@ external_stylesheets = [
     "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css",
 ]
 
-app = Dash(
-    __name__,
-    title="Gridco ESD",
-    suppress_callback_exceptions=True,
-    external_stylesheets=external_stylesheets,
-    prevent_initial_callbacks=True,
-)
-
 layout = dbc.Container(
     [
         dcc.Location(id="pathname"),
         html.Div(id="dummy-output", style={"display": "none"}),
-        dcc.Store(id="generations-store", storage_type="session"),
-        dcc.Store(id="consumptions-store", storage_type="session"),
-        dcc.Store(id="plant-consumer-store", storage_type="session"),
+        dcc.Store(id="dataset-store", storage_type="session"),
         dcc.Store(
             id="global-state-store",
             storage_type="session",
@@ -90,6 +84,29 @@ layout = dbc.Container(
                             disabled=True,
                             style={"margin-left": "2rem"},
                         ),
+                        dcc.Upload(
+                            id="append-data",
+                            children=dbc.Button(
+                                [
+                                    html.I(
+                                        className="fas fa-plus",
+                                        style={"margin-right": "0.5rem"},
+                                    ),
+                                    "Append Data",
+                                ],
+                                color="primary",
+                                outline=True,
+                                size="sm",
+                            ),
+                            accept=".xlsx,.xls",
+                            multiple=False,
+                            disabled=True,
+                            style={"margin-left": "0.5rem"},
+                        ),
+                        html.Span(
+                            id="append-status",
+                            style={"margin-left": "1rem", "font-size": "0.9rem"},
+                        ),
                     ],
                     style={
                         "display": "flex",
@@ -108,9 +125,20 @@ layout = dbc.Container(
     style={"padding": "2rem"},
 )
 
-app.layout = dmc.MantineProvider(layout)
 
-register_callbacks(app)
+def create_app() -> Dash:
+    """Build the Dash app with its layout, callbacks and server routes."""
+    app = Dash(
+        __name__,
+        title="Gridco ESD",
+        suppress_callback_exceptions=True,
+        external_stylesheets=external_stylesheets,
+        prevent_initial_callbacks=True,
+    )
+    app.layout = dmc.MantineProvider(layout)
+    register_callbacks(app)
+    return app
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,155 @@
+/*
+ * Clientside callbacks for presentation-only changes, registered by the
+ * callbacks modules through ClientsideFunction("presentation", ...).
+ *
+ * Switching the analysis type only swaps CSS classes, and switching a chart
+ * between bar and pie or between line and stacked area only re-types data
+ * the browser already holds, so none of them needs a server round-trip.
+ * The server writes the generation mix and supplier sums of the window to
+ * `gen-mix-ipps-store` and the plant profiles, as a line chart, to
+ * `plant-generation-profiles-store`; the figures are built from those here.
+ * The plotly template of the gen mix charts comes once with the layout, in
+ * `plotly-template-store`.
+ */
+(function () {
+    var VISIBLE_ROW = "main-analysis-row main-analysis-row-visible";
+    var HIDDEN_ROW = "main-analysis-row main-analysis-row-hidden";
+
+    function textFigure(message, template) {
+        return {
+            data: [],
+            layout: {
+                annotations: [{
+                    font: {color: message.color, size: message.size},
+                    showarrow: false,
+                    text: message.text,
+                    x: 0.5,
+                    xref: "paper",
+                    y: 0.5,
+                    yref: "paper",
+                }],
+                xaxis: {visible: false},
+                yaxis: {visible: false},
+                template: template,
+            },
+        };
+    }
+
+    function pieFigure(sums, title, template) {
+        return {
+            data: [{
+                domain: {x: [0.0, 1.0], y: [0.0, 1.0]},
+                hovertemplate: "%{label}<br>%{value:,.2f} mWh<br>%{percent}<extra></extra>",
+                labels: sums.labels,
+                legendgroup: "",
+                name: "",
+                showlegend: true,
+                values: sums.values,
+                type: "pie",
+                textposition: "inside",
+                texttemplate: "%{label}<br>%{percent}",
+                textinfo: "percent",
+            }],
+            layout: {
+                legend: {tracegroupgap: 0},
+                title: {text: title},
+                showlegend: true,
+                template: template,
+            },
+        };
+    }
+
+    function barFigure(sums, title, category, template) {
+        return {
+            data: [{
+                hovertemplate: category + ": %{x}<br>Generation: %{y:,.2f} mWh<extra></extra>",
+                legendgroup: "",
+                marker: {color: "#636efa", pattern: {shape: ""}},
+                name: "",
+                orientation: "v",
+                showlegend: false,
+                textposition: "inside",
+                x: sums.labels,
+                xaxis: "x",
+                y: sums.values,
+                yaxis: "y",
+                type: "bar",
+                text: sums.text,
+            }],
+            layout: {
+                xaxis: {anchor: "y", domain: [0.0, 1.0], title: {text: category}},
+                yaxis: {anchor: "x", domain: [0.0, 1.0], title: {text: "Generation (mWh)"}},
+                legend: {tracegroupgap: 0},
+                title: {text: title},
+                barmode: "relative",
+                showlegend: false,
+                template: template,
+            },
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        presentation: {
+            analysis_rows: function (analysisType) {
+                var rows = {
+                    generation: [VISIBLE_ROW, HIDDEN_ROW, HIDDEN_ROW, "block"],
+                    consumption: [HIDDEN_ROW, VISIBLE_ROW, HIDDEN_ROW, "none"],
+                    summary: [HIDDEN_ROW, HIDDEN_ROW, VISIBLE_ROW, "none"],
+                }[analysisType];
+                if (!rows) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                return rows;
+            },
+
+            gen_mix_ipps_charts: function (data, graphsType, template) {
+                if (!data) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                if (data.message) {
+                    var figure = textFigure(data.message, template);
+                    return [figure, figure];
+                }
+                if (graphsType === "pie-chart") {
+                    return [
+                        pieFigure(data.gen_mix, data.window, template),
+                        pieFigure(data.wholesale_suppliers, data.window, template),
+                    ];
+                }
+                return [
+                    barFigure(
+                        data.gen_mix,
+                        "Generation Mix: " + data.window,
+                        "Generation Type",
+                        template
+                    ),
+                    barFigure(
+                        data.wholesale_suppliers,
+                        "Wholesale Suppliers: " + data.window,
+                        "Wholesale Supplier",
+                        template
+                    ),
+                ];
+            },
+
+            plant_generation_profiles_chart: function (figure, graphType) {
+                if (!figure) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                var data = figure.data.map(function (trace, i) {
+                    var typed = Object.assign({}, trace);
+                    delete typed.fill;
+                    delete typed.stackgroup;
+                    if (graphType !== "line-chart") {
+                        typed.fill = i === 0 ? "tozeroy" : "tonexty";
+                    }
+                    if (graphType === "stacked-area-chart") {
+                        typed.stackgroup = "one";
+                    }
+                    return typed;
+                });
+                return Object.assign({}, figure, {data: data});
+            },
+        },
+    });
+})();
@@ -0,0 +1,126 @@
+/*
+ * Streams workbooks dropped on or selected in the `upload-data` and
+ * `append-data` components to the /upload route as raw bytes, instead of
+ * letting dcc.Upload read them into a base64 `contents` string. Appends name
+ * the loaded dataset in the route's `append_to` argument. The route answers
+ * with the upload job, which is written to `upload-job-store` so the
+ * progress poll and finish_upload take over from there. Listeners run in the
+ * capture phase on the document, ahead of the React handlers of dcc.Upload.
+ */
+(function () {
+    var UPLOAD_ROUTE = "/upload";
+    var UPLOAD_STAGES = 4;
+    var UPLOAD_AREAS = "#upload-data, #append-data";
+
+    function showProgress(fraction) {
+        var percent = Math.round(100 * fraction);
+        dash_clientside.set_props("upload-progress-bar", {
+            value: percent / UPLOAD_STAGES,
+            label: "Step 1 of " + UPLOAD_STAGES + ": Receiving upload (" + percent + "%)",
+        });
+    }
+
+    // dataset-store is a session dcc.Store, which keeps its data as JSON in
+    // sessionStorage under the store's id.
+    function loadedDatasetId() {
+        try {
+            return JSON.parse(window.sessionStorage.getItem("dataset-store"));
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function failUpload(file, appendTo, error) {
+        dash_clientside.set_props("upload-job-store", {
+            data: {
+                digest: null,
+                filename: file.name,
+                append_to: appendTo,
+                status: "error",
+                error: error,
+            },
+        });
+    }
+
+    function sendFile(file, appendTo) {
+        var url = UPLOAD_ROUTE + "?filename=" + encodeURIComponent(file.name);
+        if (appendTo) {
+            url += "&append_to=" + encodeURIComponent(appendTo);
+            dash_clientside.set_props("append-status", {
+                children: {
+                    namespace: "dash_html_components",
+                    type: "Span",
+                    props: {children: "Appending " + file.name + "…", style: {color: "#6c757d"}},
+                },
+            });
+        } else {
+            dash_clientside.set_props("upload-data", {disabled: true});
+        }
+        dash_clientside.set_props("upload-progress", {className: ""});
+        showProgress(0);
+
+        var xhr = new XMLHttpRequest();
+        xhr.open("POST", url);
+        xhr.setRequestHeader("Content-Type", "application/octet-stream");
+        xhr.upload.onprogress = function (event) {
+            if (event.lengthComputable) {
+                showProgress(event.loaded / event.total);
+            }
+        };
+        xhr.onload = function () {
+            var job;
+            try {
+                job = JSON.parse(xhr.responseText);
+            } catch (e) {
+                job = {error: xhr.statusText || "invalid server response"};
+            }
+            if (xhr.status !== 200) {
+                failUpload(file, appendTo, job.error || xhr.statusText);
+                return;
+            }
+            dash_clientside.set_props("upload-job-store", {data: job});
+            if (job.status === null) {
+                dash_clientside.set_props("upload-job-poll", {disabled: false, n_intervals: 0});
+            }
+        };
+        xhr.onerror = function () {
+            failUpload(file, appendTo, "the upload was interrupted");
+        };
+        xhr.send(file);
+    }
+
+    function intercept(event, area, files) {
+        if (!files || !files.length || !window.dash_clientside) {
+            return;
+        }
+        var appendTo = null;
+        if (area.id === "append-data") {
+            appendTo = loadedDatasetId();
+            if (!appendTo) {
+                return;
+            }
+        }
+        event.preventDefault();
+        event.stopPropagation();
+        sendFile(files[0], appendTo);
+    }
+
+    function uploadArea(event) {
+        return event.target.closest && event.target.closest(UPLOAD_AREAS);
+    }
+
+    document.addEventListener("drop", function (event) {
+        var area = uploadArea(event);
+        if (area) {
+            intercept(event, area, event.dataTransfer && event.dataTransfer.files);
+        }
+    }, true);
+
+    document.addEventListener("change", function (event) {
+        var area = uploadArea(event);
+        if (area && event.target.type === "file") {
+            intercept(event, area, event.target.files);
+            event.target.value = "";
+        }
+    }, true);
+})();
@@ -3,26 +3,29 @@ Callback registration module.
 Imports all callback modules to register them with the Dash app.
 """
 
-from .upload import import_me as upload_import_me  # noqa: F401
-from .metrics import import_me as metrics_import_me  # noqa: F401
-from .gen_mix_ipps import import_me as gen_mix_ipps_import_me  # noqa: F401
-from .plant_generation_profiles import import_me as plant_generation_profiles_import_me  # noqa: F401
-from .analysis_chosen import import_me as analysis_chosen_import_me  # noqa: F401
-from .consumer_analysis import import_me as consumer_analysis_import_me  # noqa: F401
-from .time_series import import_me as time_series_import_me  # noqa: F401
-
 def register_callbacks(app):
     """
-    Register all application callbacks.
+    Register all application callbacks and server routes.
 
-    Note: Callbacks are automatically registered when the module is imported,
-    so this function currently serves as a placeholder for future explicit
-    callback registration if needed.
+    Note: Callbacks are registered when their modules are imported, which
+    happens here rather than on import of the package, so that ingest
+    worker processes importing `callbacks.data_loader` skip Dash entirely.
+    Server routes, such as the streaming upload endpoint, need the Flask
+    server of the app and are registered here.
 
     Args:
         app: The Dash application instance
     """
-    pass
+    from .upload import import_me as upload_import_me  # noqa: F401
+    from .metrics import import_me as metrics_import_me  # noqa: F401
+    from .gen_mix_ipps import import_me as gen_mix_ipps_import_me  # noqa: F401
+    from .plant_generation_profiles import import_me as plant_generation_profiles_import_me  # noqa: F401
+    from .analysis_chosen import import_me as analysis_chosen_import_me  # noqa: F401
+    from .consumer_analysis import import_me as consumer_analysis_import_me  # noqa: F401
+    from .time_series import import_me as time_series_import_me  # noqa: F401
+    from .upload_route import register_upload_route
+
+    register_upload_route(app.server)
 
 
 __all__ = ["register_callbacks"]
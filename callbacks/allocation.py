@@ -0,0 +1,139 @@
+"""
+Allocation of plant generation to contracted consumers.
+
+A consumer's expected consumption for an hour is the generation of each
+contracted plant times the consumer's share (`Pct`) of that plant, summed
+over its contracts.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def hour_plant_matrix(day_generations: pd.DataFrame, plants) -> np.ndarray:
+    """
+    Pivot one day of generation into a dense 24 × len(plants) matrix.
+
+    Each cell holds the plant's first reading for that hour, or 0 when the
+    plant has none. `plants` may repeat a plant.
+    """
+    readings = (
+        day_generations.assign(Hour=day_generations["Datetime"].dt.hour)
+        .groupby(["Hour", "Plant"], observed=True)["Generation"]
+        .first()
+        .unstack("Plant")
+    )
+    return readings.reindex(index=range(24), columns=plants).fillna(0).to_numpy()
+
+
+def consumer_hourly_allocation(
+    day_generations: pd.DataFrame, consumer_plants: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Expected hourly consumption of one consumer for one day.
+
+    Args:
+        day_generations: Hourly generations of the day
+        consumer_plants: Contract rows (Plant, Pct) of the consumer
+
+    Returns:
+        DataFrame with one row per hour holding Hour, a
+        "<plant> Generation (mWh)" column per contracted plant,
+        "Expected Consumption (mWh)" and "Total Plants Generation (mWh)"
+    """
+    plants = consumer_plants["Plant"].tolist()
+    pct = consumer_plants["Pct"].to_numpy(dtype="float64")
+    generation = hour_plant_matrix(day_generations, plants)
+
+    plant_columns = {
+        f"{plant} Generation (mWh)": generation[:, i].round(2)
+        for i, plant in enumerate(plants)
+    }
+    return pd.DataFrame(
+        {
+            "Hour": np.arange(24),
+            **plant_columns,
+            "Expected Consumption (mWh)": (generation @ pct).round(2),
+            "Total Plants Generation (mWh)": generation.sum(axis=1).round(2),
+        }
+    )
+
+
+def plant_generation_matrix(generations: pd.DataFrame, plants) -> pd.DataFrame:
+    """
+    Pivot hourly generations into an hour × plant frame.
+
+    Readings of the same plant in the same hour are summed, and plants
+    without a reading in an hour get 0.
+    """
+    return (
+        generations.groupby(["Datetime", "Plant"], observed=True)["Generation"]
+        .sum()
+        .unstack("Plant")
+        .reindex(columns=plants)
+        .fillna(0)
+    )
+
+
+class AllocationMatrix:
+    """
+    Sparse Plant × Consumer matrix of contract shares.
+
+    Contracts are stored column-compressed: the plant positions and shares
+    of consumer i live in `plant_index[indptr[i]:indptr[i + 1]]` and
+    `shares[indptr[i]:indptr[i + 1]]`, so only actual contracts cost memory
+    or multiplications.
+    """
+
+    def __init__(self, plant_consumer: pd.DataFrame):
+        contracts = plant_consumer.dropna(subset=["Plant", "Consumer", "Pct"])
+        plant_codes, self.plants = pd.factorize(contracts["Plant"], sort=True)
+        consumer_codes, self.consumers = pd.factorize(contracts["Consumer"], sort=True)
+
+        order = np.argsort(consumer_codes, kind="stable")
+        self.plant_index = plant_codes[order]
+        self.shares = contracts["Pct"].to_numpy(dtype="float64")[order]
+        self.indptr = np.searchsorted(
+            consumer_codes[order], np.arange(len(self.consumers) + 1)
+        )
+
+    def apply(self, generation: np.ndarray, chunk_rows: int = 744) -> np.ndarray:
+        """
+        Multiply an hour × plant generation matrix by the allocation matrix.
+
+        Args:
+            generation: Array of shape (hours, len(self.plants))
+            chunk_rows: Hours multiplied at once, bounding the temporary
+                hours × contracts array
+
+        Returns:
+            Expected consumption of shape (hours, len(self.consumers))
+        """
+        expected = np.zeros((generation.shape[0], len(self.consumers)))
+        if not len(self.shares):
+            return expected
+
+        for lo in range(0, generation.shape[0], chunk_rows):
+            contributions = generation[lo : lo + chunk_rows, self.plant_index]
+            contributions *= self.shares
+            expected[lo : lo + chunk_rows] = np.add.reduceat(
+                contributions, self.indptr[:-1], axis=1
+            )
+        return expected
+
+    def expected_consumption(self, generations: pd.DataFrame) -> pd.DataFrame:
+        """
+        Expected hourly consumption of every consumer.
+
+        Args:
+            generations: Hourly generations (Datetime, Plant, Generation)
+
+        Returns:
+            DataFrame indexed by Datetime with one column per consumer
+        """
+        generation = plant_generation_matrix(generations, self.plants)
+        return pd.DataFrame(
+            self.apply(generation.to_numpy()),
+            index=generation.index,
+            columns=self.consumers,
+        )
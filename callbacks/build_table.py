@@ -12,6 +12,8 @@ def _format_cell(value):
 
 def build_table_from_df(df: pd.DataFrame, caption: str):
     head = df.columns.tolist()
+    # Categorical columns cannot take the "" fill value.
+    df = df.astype({col: object for col in df.select_dtypes("category").columns})
     body = [[_format_cell(val) for val in row] for row in df.fillna("").values.tolist()]
 
     return dmc.TableScrollContainer(
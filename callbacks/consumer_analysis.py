@@ -1,9 +1,10 @@
 import plotly.graph_objects as go
 import pandas as pd
-from io import StringIO
 from datetime import datetime
-from dash import callback, Input, Output, State
+from dash import callback, Input, Output
 
+from .allocation import consumer_hourly_allocation
+from .datasets import get_dataset
 from .utitls import text_fig
 from .build_table import build_table_from_df
 
@@ -21,25 +22,16 @@ EMPTY_TABLE_CONSUMPTION_TABLE = build_table_from_df(
     inputs=dict(
         selected_consumer=Input("comsumption-analysis-consumer-select", "value"),
         selected_date_str=Input("comsumption-analysis-date-select", "date"),
-        generations_json=State("generations-store", "data"),
-        consumptions_json=State("consumptions-store", "data"),
-        plant_consumer_json=State("plant-consumer-store", "data"),
+        dataset_id=Input("dataset-store", "data"),
     ),
 )
 def update_dashboard(
     selected_consumer: str,
     selected_date_str: str,
-    generations_json: str,
-    consumptions_json: str,
-    plant_consumer_json: str,
+    dataset_id: str,
 ):
-    if (
-        not selected_consumer
-        or not selected_date_str
-        or not generations_json
-        or not consumptions_json
-        or not plant_consumer_json
-    ):
+    dataset = get_dataset(dataset_id)
+    if not selected_consumer or not selected_date_str or dataset is None:
         return {
             "consumption_analysis_table": EMPTY_TABLE_CONSUMPTION_TABLE,
             "consumption_analysis_chart": text_fig(
@@ -48,20 +40,15 @@ def update_dashboard(
         }
 
     try:
-        generations = pd.read_json(StringIO(generations_json), orient="split")
-        actual_consumptions = pd.read_json(StringIO(consumptions_json), orient="split")
-        plant_consumer = pd.read_json(StringIO(plant_consumer_json), orient="split")
+        plant_consumer = dataset.plant_consumer
 
         selected_date = datetime.strptime(selected_date_str, "%Y-%m-%d").date()
         consumer_plants = plant_consumer[
             plant_consumer["Consumer"] == selected_consumer
         ]
-        customer_actual_consumptions = actual_consumptions[
-            (actual_consumptions["Consumer"] == selected_consumer)
-            & (actual_consumptions["Datetime"].dt.date == selected_date)
-        ]
+        settled_day = dataset.consumer_day(selected_consumer, selected_date)
 
-        date_generations = generations[generations["Datetime"].dt.date == selected_date]
+        date_generations = dataset.generations.day(selected_date)
     except Exception:
         return {
             "consumption_analysis_table": EMPTY_TABLE_CONSUMPTION_TABLE,
@@ -69,59 +56,10 @@ def update_dashboard(
         }
 
     if len(consumer_plants) > 0:
-        hourly_data = []
-
-        for hour in range(24):
-            row_data = {"Hour": hour}
-
-            # Calculate consumption and get plant readings for this hour
-            total_consumption = 0
-            total_generation = 0
-
-            for _, plant_row in consumer_plants.iterrows():
-                plant = plant_row["Plant"]
-                pct = plant_row["Pct"]
-
-                # Get reading for this plant at this hour
-                plant_genearations: pd.DataFrame = date_generations[  # type: ignore
-                    (date_generations["Plant"] == plant)
-                    & (date_generations["Datetime"].dt.hour == hour)  # type: ignore
-                ]
-
-                if len(plant_genearations) > 0:
-                    generation_value = plant_genearations.iloc[0]["Generation"]
-                    consumption = generation_value * pct
-                    total_consumption += consumption
-                    total_generation += generation_value
-
-                    row_data[f"{plant} Generation (mWh)"] = round(generation_value, 2)
-                else:
-                    row_data[f"{plant} Generation (mWh)"] = 0
-
-            row_data["Expected Consumption (mWh)"] = round(total_consumption, 2)
-            row_data["Total Plants Generation (mWh)"] = round(total_generation, 2)
-            hourly_data.append(row_data)
-
-        hourly_df = pd.DataFrame(hourly_data)
-
-        # Add actual consumption by merging on hour
-        if len(customer_actual_consumptions) > 0:
-            customer_actual_consumptions_with_hour = customer_actual_consumptions.copy()
-            customer_actual_consumptions_with_hour["Hour"] = (
-                customer_actual_consumptions_with_hour["Datetime"].dt.hour  # type: ignore
-            )
-            # Convert Consumption from Wh to mWh
-            customer_actual_consumptions_with_hour["Consumption_mWh"] = (
-                customer_actual_consumptions_with_hour["Consumption"]
-            )
-            actual_consumption_map = customer_actual_consumptions_with_hour.set_index(
-                "Hour"
-            )["Consumption_mWh"].to_dict()
-            hourly_df["Actual Consumption (mWh)"] = (
-                hourly_df["Hour"].map(actual_consumption_map).fillna(0)  # type: ignore
-            )
-        else:
-            hourly_df["Actual Consumption (mWh)"] = 0
+        hourly_df = consumer_hourly_allocation(date_generations, consumer_plants)
+
+        # Actual consumption comes from the settlement of the selected day
+        hourly_df["Actual Consumption (mWh)"] = settled_day["Actual"].to_numpy()
 
         # Reorder columns: Hour, Expected Consumption, Actual Consumption, individual plants, Total
         plant_cols = [
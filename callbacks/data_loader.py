@@ -4,10 +4,54 @@ Data loader utility for Excel file processing.
 Handles extraction and transformation of energy consumption data.
 """
 
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
 
+import datetime as dt
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from io import BytesIO
+from pathlib import Path
+
+
+# Columns read from each sheet of the settlement workbook.
+SHEET_COLUMNS = {
+    "Generation": ["Date", "Time", "Generation", "Gen_Consumption", "GMeter"],
+    "Generation_Register": [
+        "GMeter",
+        "Generator_Name",
+        "Wholesale_Supplier",
+        "Gen_Mix",
+    ],
+    "Load_Consumption": ["Day", "Time", "Consumption", "CMeter"],
+    "Load_Register": ["CMeter", "Customer"],
+    "Contract_Register": ["Wholesale_Supplier", "Load", "EnergyShared%"],
+}
+
+# Rows of a reading sheet parsed and reduced to hourly buckets at a time.
+DEFAULT_BATCH_ROWS = 100_000
+
+# Whether uploads parse their sheets concurrently in worker processes.
+PARALLEL_INGEST = (os.cpu_count() or 1) > 1
+
+# Smallest workbook parsed in worker processes. Spawning the workers costs
+# ~6 s on first use, while a workbook parses at roughly 3 s per MB, so
+# smaller workbooks finish sooner in the calling thread.
+PARALLEL_INGEST_MIN_BYTES = 8 * 1024**2
+
+# Day zero of Excel date serials (1900 date system).
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+# Identifier columns repeated on every hourly row, stored as categoricals.
+GENERATION_ID_COLUMNS = ["Plant", "Wholesale_Supplier", "Gen_Mix"]
+CONSUMPTION_ID_COLUMNS = ["Consumer"]
 
 
 @dataclass(frozen=True, slots=True)
@@ -17,117 +61,465 @@ class UploadedData:
     plant_consumer: pd.DataFrame
 
 
-class EnergyDataLoader:
-    """Utility class to load and process energy consumption data from Excel files."""
+def _iter_batches(
+    worksheet, columns: list[str], batch_rows: int | None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the given columns of a read-only worksheet as DataFrames.
 
-    @staticmethod
-    def load_from_excel(file_content: bytes) -> UploadedData:
-        """
-        Load energy data from Excel file content.
+    Each DataFrame holds at most `batch_rows` non-empty rows, or the whole
+    sheet when `batch_rows` is None.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, ())
+    positions = {name: i for i, name in enumerate(header) if name is not None}
+    missing = [col for col in columns if col not in positions]
+    if missing:
+        raise ValueError(f"Sheet '{worksheet.title}' is missing columns: {missing}")
 
-        Args:
-            file_content: Bytes content of the Excel file
+    indexes = [positions[col] for col in columns]
+    records = []
+    for row in rows:
+        record = [row[i] if i < len(row) else None for i in indexes]
+        if any(value is not None for value in record):
+            records.append(record)
+            if len(records) == batch_rows:
+                yield pd.DataFrame.from_records(records, columns=columns)
+                records = []
+    if records:
+        yield pd.DataFrame.from_records(records, columns=columns)
 
-        Returns:
-            UploadedData
-        """
-        excel_file = BytesIO(file_content)
-        generations = pd.read_excel(
-            excel_file,
-            sheet_name="Generation",
-            usecols=["Date", "Time", "Generation", "Gen_Consumption", "GMeter"],
-        )
 
-        name_mapping_gen = pd.read_excel(
-            excel_file,
-            sheet_name="Generation_Register",
-            usecols=["GMeter", "Generator_Name", "Wholesale_Supplier", "Gen_Mix"],
-        )
+def _read_sheet(worksheet, columns: list[str]) -> pd.DataFrame:
+    """Read the given columns of a read-only worksheet into one DataFrame."""
+    batches = list(_iter_batches(worksheet, columns, batch_rows=None))
+    return batches[0] if batches else pd.DataFrame(columns=columns)
 
-        generations = generations.dropna(
-            subset=["Date", "Time", "Generation", "Gen_Consumption", "GMeter"]
-        ).copy()
-        generations["Datetime"] = pd.to_datetime(
-            generations["Date"].astype(str) + " " + generations["Time"].astype(str)
-        )
-        generations = generations.drop(columns=["Date", "Time"])
 
-        plant_name_dict = dict(
-            zip(name_mapping_gen["GMeter"], name_mapping_gen["Generator_Name"])
-        )
-        plant_wholesale_supplier_dict = dict(
-            zip(name_mapping_gen["GMeter"], name_mapping_gen["Wholesale_Supplier"])
-        )
-        plant_gen_mix_dict = dict(
-            zip(name_mapping_gen["GMeter"], name_mapping_gen["Gen_Mix"])
-        )
-        generations["Wholesale_Supplier"] = generations["GMeter"].map(
-            plant_wholesale_supplier_dict
-        )
-        generations["Plant"] = generations["GMeter"].map(plant_name_dict)
-        generations["Gen_Mix"] = generations["GMeter"].map(plant_gen_mix_dict)
-        generations.drop(columns=["GMeter"], inplace=True)
-        generations = (
-            generations.set_index("Datetime")
-            .groupby(["Plant", "Wholesale_Supplier", "Gen_Mix"])
-            .resample("h", include_groups=False)["Generation", "Gen_Consumption"]
-            .sum()
-            .reset_index()
-        )
+def _day_start(value) -> pd.Timestamp:
+    """Midnight of a Date cell: a date, datetime, Excel serial or ISO text."""
+    if isinstance(value, (int, float)):
+        timestamp = EXCEL_EPOCH + pd.Timedelta(days=value)
+    elif isinstance(value, str):
+        timestamp = pd.to_datetime(value.strip(), format="ISO8601")
+    else:
+        timestamp = pd.Timestamp(value)
+    return timestamp.normalize()
 
-        excel_file.seek(0)
-        consumptions = pd.read_excel(
-            excel_file,
-            sheet_name="Load_Consumption",
-            usecols=["Day", "Time", "Consumption", "CMeter"],
-        )
 
-        name_mapping_cons = pd.read_excel(
-            excel_file,
-            sheet_name="Load_Register",
-            usecols=["CMeter", "Customer"],
+def _time_of_day(value) -> pd.Timedelta:
+    """Offset from midnight of a Time cell, from any type _day_start accepts."""
+    if isinstance(value, dt.time):
+        return pd.Timedelta(
+            hours=value.hour,
+            minutes=value.minute,
+            seconds=value.second,
+            microseconds=value.microsecond,
         )
+    if isinstance(value, dt.datetime):
+        timestamp = pd.Timestamp(value)
+        return timestamp - timestamp.normalize()
+    if isinstance(value, (int, float)):
+        return pd.Timedelta(days=value).round("us")
+    if isinstance(value, str):
+        text = value.strip()
+        return pd.to_timedelta(text if text.count(":") == 2 else f"{text}:00")
+    return pd.Timedelta(value)
 
-        consumptions = consumptions.dropna(
-            subset=["Day", "Time", "Consumption", "CMeter"]
-        ).copy()
-        consumptions["Datetime"] = pd.to_datetime(
-            consumptions["Day"].astype(str) + " " + consumptions["Time"].astype(str)
-        )
-        consumptions = consumptions.drop(columns=["Day", "Time"]).rename(
-            columns={"CMeter": "Consumer"}
-        )
 
-        consumer_name_dict = dict(
-            zip(name_mapping_cons["CMeter"], name_mapping_cons["Customer"])
-        )
-        consumptions["Consumer"] = consumptions["Consumer"].map(consumer_name_dict)
-        consumptions = (
-            consumptions.set_index("Datetime")
-            .groupby("Consumer")
-            .resample("h", include_groups=False)
-            .sum()
-            .reset_index()
-        )
+def _convert_distinct(values: pd.Series, convert, dtype: str) -> np.ndarray:
+    """Apply a scalar converter once per distinct value of an object column."""
+    codes, distinct = pd.factorize(values)
+    converted = np.array(
+        [convert(value).as_unit("ns").asm8 for value in distinct], dtype=dtype
+    )
+    return converted[codes]
+
+
+def _day_starts(dates: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(dates):
+        days = np.floor(dates.to_numpy(dtype="float64")).astype("int64")
+        return EXCEL_EPOCH.to_datetime64() + days.astype("timedelta64[D]")
+    return _convert_distinct(dates, _day_start, "datetime64[ns]")
+
+
+def _times_of_day(times: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(times):
+        fraction = np.mod(times.to_numpy(dtype="float64"), 1.0)
+        micros = np.rint(fraction * 86_400_000_000).astype("int64")
+        return micros.astype("timedelta64[us]").astype("timedelta64[ns]")
+    return _convert_distinct(times, _time_of_day, "timedelta64[ns]")
+
+
+def combine_date_time(dates: pd.Series, times: pd.Series) -> pd.Series:
+    """
+    Combine Date and Time cells into one datetime64[ns] Series.
+
+    Numeric columns of Excel serials are converted with array arithmetic.
+    Columns of cell objects repeat heavily (one date per day, one time per
+    reading slot), so each distinct value is converted once. The day and
+    time-of-day offsets are then added as integer arrays. Neither Series
+    may hold missing values.
+    """
+    return pd.Series(
+        _day_starts(dates) + _times_of_day(times), index=dates.index, name="Datetime"
+    )
+
+
+def bucket_hourly(
+    frame: pd.DataFrame, keys: list[str], values: list[str], fill_gaps: bool = True
+) -> pd.DataFrame:
+    """
+    Sum readings into hourly buckets per key combination.
+
+    Matches `set_index("Datetime").groupby(keys).resample("h").sum()`: rows
+    with a missing key are dropped, and every group spans each hour from its
+    first to its last reading, with hours lacking readings filled with 0.
+    Groups are numbered with integer codes and each reading is scatter-added
+    into its group's run of hours in one vectorized pass.
+
+    Args:
+        frame: Readings with a Datetime column, the key columns and the value
+            columns
+        keys: Columns identifying a meter, plant or consumer
+        values: Reading columns to sum
+        fill_gaps: Whether hours without readings inside a group's run are
+            kept as 0 rows, or dropped
+
+    Returns:
+        DataFrame with the key columns, Datetime and the summed value
+        columns, ordered by keys then Datetime
+    """
+    grouped = frame.groupby(keys, sort=True, dropna=True)
+    codes = grouped.ngroup()
+    groups = grouped.size().index
+    readings = codes.notna().to_numpy()
+    codes = codes[readings].to_numpy(dtype="int64")
+    hours = (
+        frame["Datetime"]
+        .to_numpy(dtype="datetime64[ns]")[readings]
+        .astype("datetime64[h]")
+        .astype("int64")
+    )
+
+    # Each group owns the contiguous run of hours first[g]..last[g] in the
+    # output, starting at offsets[g].
+    first = np.full(len(groups), np.iinfo("int64").max)
+    last = np.full(len(groups), np.iinfo("int64").min)
+    np.minimum.at(first, codes, hours)
+    np.maximum.at(last, codes, hours)
+    lengths = last - first + 1
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    positions = offsets[codes] + hours - first[codes]
+
+    total = int(lengths.sum())
+    group_of_row = np.repeat(np.arange(len(groups)), lengths)
+    hour_of_row = first[group_of_row] + np.arange(total) - offsets[group_of_row]
+
+    buckets = {key: groups.get_level_values(key).take(group_of_row) for key in keys}
+    buckets["Datetime"] = hour_of_row.astype("datetime64[h]").astype("datetime64[ns]")
+    for column in values:
+        weights = frame[column].to_numpy(dtype="float64")[readings]
+        buckets[column] = np.bincount(
+            positions, weights=weights, minlength=total
+        ).astype("float64")
+    buckets = pd.DataFrame(buckets)
+    if not fill_gaps:
+        buckets = buckets[np.bincount(positions, minlength=total) > 0]
+        buckets = buckets.reset_index(drop=True)
+    return buckets
+
+
+def _reduce_hourly(
+    batches: Iterable[pd.DataFrame],
+    keys: list[str],
+    values: list[str],
+    fill_gaps: bool = True,
+) -> pd.DataFrame:
+    """
+    Reduce batches of readings into one frame of hourly buckets.
+
+    Every batch is bucketed as soon as it is read, so raw rows never
+    accumulate. Partial buckets are merged whenever they outnumber the rows
+    merged so far, which keeps memory proportional to the hourly output
+    rather than to the sheet.
+    """
+
+    def bucket(frame: pd.DataFrame) -> pd.DataFrame:
+        return bucket_hourly(frame, keys, values, fill_gaps)
+
+    parts, merged_rows, pending_rows = [], 0, 0
+    for batch in batches:
+        part = bucket(batch)
+        parts.append(part)
+        pending_rows += len(part)
+        if pending_rows > merged_rows and len(parts) > 1:
+            parts = [bucket(pd.concat(parts, ignore_index=True))]
+            merged_rows, pending_rows = len(parts[0]), 0
+
+    if not parts:
+        return bucket(pd.DataFrame(columns=["Datetime", *keys, *values]))
+    if len(parts) == 1:
+        return parts[0]
+    return bucket(pd.concat(parts, ignore_index=True))
 
-        excel_file.seek(0)
-        plant_consumer = pd.read_excel(
-            excel_file,
-            sheet_name="Contract_Register",
-            usecols=["Wholesale_Supplier", "Load", "EnergyShared%"],
+
+def _load_generations(workbook, batch_rows: int, fill_gaps: bool) -> pd.DataFrame:
+    """Stream the Generation sheet into hourly plant buckets."""
+    register = _read_sheet(
+        workbook["Generation_Register"], SHEET_COLUMNS["Generation_Register"]
+    )
+    meter_attributes = {
+        "Plant": dict(zip(register["GMeter"], register["Generator_Name"])),
+        "Wholesale_Supplier": dict(
+            zip(register["GMeter"], register["Wholesale_Supplier"])
+        ),
+        "Gen_Mix": dict(zip(register["GMeter"], register["Gen_Mix"])),
+    }
+
+    def prepare(batch: pd.DataFrame) -> pd.DataFrame:
+        batch = batch.dropna()
+        return pd.DataFrame(
+            {
+                "Datetime": combine_date_time(batch["Date"], batch["Time"]),
+                **{
+                    column: batch["GMeter"].map(mapping)
+                    for column, mapping in meter_attributes.items()
+                },
+                "Generation": batch["Generation"],
+                "Gen_Consumption": batch["Gen_Consumption"],
+            }
         )
-        plant_consumer.rename(
-            columns={
-                "Wholesale_Supplier": "Plant",
-                "Load": "Consumer",
-                "EnergyShared%": "Pct",
-            },
-            inplace=True,
+
+    batches = _iter_batches(
+        workbook["Generation"], SHEET_COLUMNS["Generation"], batch_rows
+    )
+    return _reduce_hourly(
+        map(prepare, batches),
+        GENERATION_ID_COLUMNS,
+        ["Generation", "Gen_Consumption"],
+        fill_gaps,
+    )
+
+
+def _load_consumptions(workbook, batch_rows: int, fill_gaps: bool) -> pd.DataFrame:
+    """Stream the Load_Consumption sheet into hourly consumer buckets."""
+    register = _read_sheet(workbook["Load_Register"], SHEET_COLUMNS["Load_Register"])
+    consumer_names = dict(zip(register["CMeter"], register["Customer"]))
+
+    def prepare(batch: pd.DataFrame) -> pd.DataFrame:
+        batch = batch.dropna()
+        return pd.DataFrame(
+            {
+                "Datetime": combine_date_time(batch["Day"], batch["Time"]),
+                "Consumer": batch["CMeter"].map(consumer_names),
+                "Consumption": batch["Consumption"],
+            }
         )
 
+    batches = _iter_batches(
+        workbook["Load_Consumption"], SHEET_COLUMNS["Load_Consumption"], batch_rows
+    )
+    return _reduce_hourly(
+        map(prepare, batches), CONSUMPTION_ID_COLUMNS, ["Consumption"], fill_gaps
+    )
+
+
+def _load_contracts(workbook, batch_rows: int, fill_gaps: bool) -> pd.DataFrame:
+    """Read the Contract_Register sheet as Plant, Consumer and Pct columns."""
+    contracts = _read_sheet(
+        workbook["Contract_Register"], SHEET_COLUMNS["Contract_Register"]
+    )
+    return contracts.rename(
+        columns={
+            "Wholesale_Supplier": "Plant",
+            "Load": "Consumer",
+            "EnergyShared%": "Pct",
+        }
+    )
+
+
+# Independent ingest jobs, one per UploadedData frame. Each reads its data
+# sheet and the register that names its meters.
+INGEST_JOBS = {
+    "generations": _load_generations,
+    "consumptions": _load_consumptions,
+    "plant_consumer": _load_contracts,
+}
+
+# Sheets each ingest job reads, its data sheet first. A delta workbook may
+# leave out the data sheet of any job, whose frame then comes back empty.
+INGEST_SHEETS = {
+    "generations": ("Generation", "Generation_Register"),
+    "consumptions": ("Load_Consumption", "Load_Register"),
+    "plant_consumer": ("Contract_Register",),
+}
+
+EMPTY_FRAME_COLUMNS = {
+    "generations": [
+        *GENERATION_ID_COLUMNS,
+        "Datetime",
+        "Generation",
+        "Gen_Consumption",
+    ],
+    "consumptions": [*CONSUMPTION_ID_COLUMNS, "Datetime", "Consumption"],
+    "plant_consumer": ["Plant", "Consumer", "Pct"],
+}
+
+
+def _open_workbook(source: bytes | str | os.PathLike):
+    """Open workbook bytes, or the workbook file at a path, read-only."""
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    return load_workbook(source, read_only=True, data_only=True)
+
+
+def _ingest(workbook, job: str, batch_rows: int, delta: bool) -> pd.DataFrame:
+    """Run one ingest job on an open workbook."""
+    if delta:
+        sheet, *registers = INGEST_SHEETS[job]
+        if sheet not in workbook.sheetnames:
+            return pd.DataFrame(columns=EMPTY_FRAME_COLUMNS[job])
+        missing = [name for name in registers if name not in workbook.sheetnames]
+        if missing:
+            # Without its register the sheet's meters cannot be named, and
+            # its readings would otherwise be dropped without a word.
+            raise ValueError(f"Sheet '{sheet}' needs the sheets: {missing}")
+        # A delta restates only the hours it has readings for, so hours
+        # between its readings are not filled with 0.
+        return INGEST_JOBS[job](workbook, batch_rows, fill_gaps=False)
+    return INGEST_JOBS[job](workbook, batch_rows, fill_gaps=True)
+
+
+def _run_ingest_job(source, job: str, batch_rows: int, delta: bool) -> pd.DataFrame:
+    """Run one ingest job on its own read-only workbook, in a worker process."""
+    workbook = _open_workbook(source)
+    try:
+        return _ingest(workbook, job, batch_rows, delta)
+    finally:
+        workbook.close()
+
+
+_ingest_pool: ProcessPoolExecutor | None = None
+_ingest_pool_lock = threading.Lock()
+
+
+def _get_ingest_pool() -> ProcessPoolExecutor:
+    """Return the shared ingest pool, starting its workers on first use."""
+    global _ingest_pool
+    with _ingest_pool_lock:
+        if _ingest_pool is None:
+            # Workers are spawned rather than forked: forking the threaded
+            # Dash server can copy held locks into the children.
+            _ingest_pool = ProcessPoolExecutor(
+                max_workers=len(INGEST_JOBS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _ingest_pool
+
+
+def use_parallel_ingest(source: bytes | str | os.PathLike) -> bool:
+    """Whether a workbook is large enough to parse in worker processes."""
+    if not PARALLEL_INGEST:
+        return False
+    size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+    return size >= PARALLEL_INGEST_MIN_BYTES
+
+
+def _ingest_parallel(source, batch_rows: int, delta: bool) -> dict[str, pd.DataFrame]:
+    """Run every ingest job concurrently, one worker process per job."""
+    if isinstance(source, bytes):
+        # Workers open a path themselves rather than each receiving a
+        # pickled copy of the workbook.
+        fd, name = tempfile.mkstemp(suffix=".xlsx")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(source)
+            return _ingest_parallel(Path(name), batch_rows, delta)
+        finally:
+            os.unlink(name)
+
+    global _ingest_pool
+    pool = _get_ingest_pool()
+    try:
+        futures = {
+            job: pool.submit(_run_ingest_job, source, job, batch_rows, delta)
+            for job in INGEST_JOBS
+        }
+        return {job: future.result() for job, future in futures.items()}
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool for the next upload.
+        with _ingest_pool_lock:
+            if _ingest_pool is pool:
+                _ingest_pool = None
+        raise
+
+
+def _ingest_serial(source, batch_rows: int, delta: bool) -> dict[str, pd.DataFrame]:
+    """Run every ingest job in turn on one shared workbook."""
+    # One read-only workbook serves every sheet, so the zip archive and
+    # shared strings are parsed once.
+    workbook = _open_workbook(source)
+    try:
+        return {job: _ingest(workbook, job, batch_rows, delta) for job in INGEST_JOBS}
+    finally:
+        workbook.close()
+
+
+class EnergyDataLoader:
+    """Utility class to load and process energy consumption data from Excel files."""
+
+    @staticmethod
+    def load_from_excel(
+        file_content: bytes | str | os.PathLike,
+        float32: bool = False,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        parallel: bool = False,
+        delta: bool = False,
+    ) -> UploadedData:
+        """
+        Load energy data from Excel file content.
+
+        Identifier columns come back as categoricals, so each hourly row
+        holds an integer code instead of a string object.
+
+        Args:
+            file_content: Bytes content of the Excel file, or the path of a
+                file holding it. Worker processes of the parallel mode open a
+                path themselves; bytes are first written to a temp file.
+            float32: Store readings as float32 instead of float64, halving
+                their memory at the cost of ~7 significant digits
+            batch_rows: Rows of the Generation and Load_Consumption sheets
+                parsed and bucketed at a time, bounding peak memory
+            parallel: Parse the generation, consumption and contract sheets
+                concurrently in worker processes instead of one after another
+            delta: Load a workbook of new or restated readings to append to
+                a dataset. Sheets may be left out, giving empty frames, but a
+                Generation or Load_Consumption sheet needs its register, and
+                only hours that have readings are kept.
+
+        Returns:
+            UploadedData
+        """
+        ingest = _ingest_parallel if parallel else _ingest_serial
+        frames = ingest(file_content, batch_rows, delta)
+        generations = frames["generations"]
+        consumptions = frames["consumptions"]
+        plant_consumer = frames["plant_consumer"]
+
         generations[["Generation", "Gen_Consumption"]] /= 1_000_000
         consumptions["Consumption"] /= 1_000_000
 
+        reading_dtype = "float32" if float32 else "float64"
+        generations = generations.astype(
+            {col: "category" for col in GENERATION_ID_COLUMNS}
+            | {"Generation": reading_dtype, "Gen_Consumption": reading_dtype}
+        )
+        consumptions = consumptions.astype(
+            {col: "category" for col in CONSUMPTION_ID_COLUMNS}
+            | {"Consumption": reading_dtype}
+        )
+
         return UploadedData(
             generations=generations,
             consumptions=consumptions,
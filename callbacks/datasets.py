@@ -0,0 +1,427 @@
+"""
+Server-side registry of uploaded datasets.
+
+The browser only keeps a dataset ID (the SHA-256 of the uploaded workbook)
+in `dataset-store`. Callbacks resolve the ID through a per-process LRU of
+loaded datasets, falling back to the on-disk Parquet cache when the upload
+was handled by another worker or the process has restarted. The burst of
+callbacks fired by one date change therefore loads a dataset at most once.
+
+A loaded dataset keeps per-month summaries and per-consumer settlement
+totals in memory, while its hourly rows stay in the month partitions of
+the cache and are read by window, so the cache entries of loaded datasets
+are pinned against eviction.
+The summaries are also written next to the partitions in the cache entry,
+so a dataset loaded again after a restart, or by another worker, is built
+from them without reading its partitions. Appending a delta workbook
+registers a new dataset, derived from the base dataset by updating only
+the months the delta touches.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .allocation import AllocationMatrix
+from .data_loader import (
+    CONSUMPTION_ID_COLUMNS,
+    GENERATION_ID_COLUMNS,
+    UploadedData,
+)
+from .lru_cache import CacheInfo, LRUCache
+from .parquet_cache import CachedDataset, dataset_cache
+from .partitions import PartitionedFrame, split_months
+from .rollups import LEVELS, RollupCube, month_cells
+from .settlement import Settlement, compute_settlement, sum_summaries
+from .time_index import PrefixSums, TimeIndexedFrame, concat_frames
+
+
+MAX_DATASETS_IN_MEMORY = 4
+
+GENERATION_MEASURES = ["Generation", "Gen_Consumption"]
+CONSUMPTION_MEASURES = ["Consumption"]
+
+_datasets = LRUCache(MAX_DATASETS_IN_MEMORY)
+
+
+def _normalize_datetimes(values: pd.Series) -> pd.Series:
+    values = pd.to_datetime(values)
+    if values.dt.tz is not None:
+        values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+    return values.astype("datetime64[ns]")
+
+
+def _normalize_readings(values: pd.Series) -> pd.Series:
+    # float32 readings are an opt-in of the loader, so keep them as they are.
+    if values.dtype in ("float32", "float64"):
+        return values
+    return values.astype("float64")
+
+
+def normalize_dtypes(uploaded_data: UploadedData) -> UploadedData:
+    """
+    Coerce the frames of a dataset to the dtypes the callbacks expect.
+
+    Datetimes become tz-naive datetime64[ns], identifier columns
+    categorical and readings float (float64 unless the loader produced
+    float32), so callbacks can filter and aggregate without re-parsing
+    columns.
+    """
+    generations = uploaded_data.generations.astype(
+        {col: "category" for col in GENERATION_ID_COLUMNS}
+    ).assign(
+        Datetime=lambda df: _normalize_datetimes(df["Datetime"]),
+        Generation=lambda df: _normalize_readings(df["Generation"]),
+        Gen_Consumption=lambda df: _normalize_readings(df["Gen_Consumption"]),
+    )
+    consumptions = uploaded_data.consumptions.astype(
+        {col: "category" for col in CONSUMPTION_ID_COLUMNS}
+    ).assign(
+        Datetime=lambda df: _normalize_datetimes(df["Datetime"]),
+        Consumption=lambda df: _normalize_readings(df["Consumption"]),
+    )
+    plant_consumer = uploaded_data.plant_consumer.assign(
+        Pct=lambda df: df["Pct"].astype("float64")
+    )
+    return UploadedData(
+        generations=generations,
+        consumptions=consumptions,
+        plant_consumer=plant_consumer,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class MonthSummary:
+    generation_totals: pd.DataFrame
+    consumption_totals: pd.DataFrame
+    cells: dict[str, pd.DataFrame]
+    consumers: list
+
+
+def summarize_month(
+    generations: pd.DataFrame, consumptions: pd.DataFrame
+) -> MonthSummary:
+    """Per-hour totals, rollup cells and metered consumers of one month."""
+    return MonthSummary(
+        generation_totals=generations.groupby("Datetime")[GENERATION_MEASURES]
+        .sum()
+        .reset_index(),
+        consumption_totals=consumptions.groupby("Datetime")[CONSUMPTION_MEASURES]
+        .sum()
+        .reset_index(),
+        cells=month_cells(generations),
+        consumers=consumptions["Consumer"].dropna().unique().tolist(),
+    )
+
+
+def _pack_summaries(
+    summaries: dict[str, MonthSummary], settled: dict[str, pd.DataFrame]
+) -> dict[str, pd.DataFrame]:
+    """Month summaries and settlement totals as frames keyed by a Month column."""
+
+    def stack(parts: dict[str, pd.DataFrame]) -> pd.DataFrame:
+        frames = [part.assign(Month=month) for month, part in parts.items()]
+        return concat_frames(frames)
+
+    frames = {
+        "generation_totals": stack(
+            {month: part.generation_totals for month, part in summaries.items()}
+        ),
+        "consumption_totals": stack(
+            {month: part.consumption_totals for month, part in summaries.items()}
+        ),
+        "consumers": stack(
+            {
+                month: pd.DataFrame(
+                    {"Consumer": pd.Series(part.consumers, dtype=object)}
+                )
+                for month, part in summaries.items()
+            }
+        ),
+        "settlement": stack(settled),
+    }
+    for unit in LEVELS[1:]:
+        frames[f"cells_{unit}"] = stack(
+            {month: part.cells[unit] for month, part in summaries.items()}
+        )
+    return frames
+
+
+def _unpack_summaries(
+    frames: dict[str, pd.DataFrame],
+) -> tuple[dict[str, MonthSummary], dict[str, pd.DataFrame]]:
+    """Month summaries and settlement totals from `_pack_summaries` frames."""
+    months = sorted(set().union(*(frame["Month"] for frame in frames.values())))
+
+    def split(name: str) -> dict[str, pd.DataFrame]:
+        frame = frames[name]
+        parts = {
+            month: part.drop(columns="Month").reset_index(drop=True)
+            for month, part in frame.groupby("Month", sort=False)
+        }
+        empty = frame.drop(columns="Month").iloc[:0]
+        return {month: parts.get(month, empty) for month in months}
+
+    generation_totals = split("generation_totals")
+    consumption_totals = split("consumption_totals")
+    consumers = split("consumers")
+    cells = {unit: split(f"cells_{unit}") for unit in LEVELS[1:]}
+    summaries = {
+        month: MonthSummary(
+            generation_totals=generation_totals[month],
+            consumption_totals=consumption_totals[month],
+            cells={unit: cells[unit][month] for unit in LEVELS[1:]},
+            consumers=consumers[month]["Consumer"].tolist(),
+        )
+        for month in months
+    }
+    return summaries, split("settlement")
+
+
+def _concat_totals(parts: list[pd.DataFrame], columns: list[str]) -> pd.DataFrame:
+    if not parts:
+        return pd.DataFrame(columns=["Datetime", *columns])
+    return pd.concat(parts, ignore_index=True)
+
+
+class Dataset:
+    """A cached dataset together with the indexes the callbacks query."""
+
+    def __init__(
+        self,
+        dataset_id: str,
+        tables: CachedDataset,
+        summaries: dict[str, MonthSummary] | None = None,
+        settled: dict[str, pd.DataFrame] | None = None,
+    ):
+        """
+        Args:
+            dataset_id: Content digest of the dataset
+            tables: Month-partitioned tables of the dataset
+            summaries: Summaries of months known to be unchanged, such as
+                those of the dataset a delta was appended to. Every other
+                month is read and summarized here.
+            settled: Settlement summaries of months known to be unchanged,
+                under the same contracts. Every other month is settled here.
+        """
+        self.id = dataset_id
+        self.generations = tables.generations
+        self.consumptions = tables.consumptions
+        self.plant_consumer = tables.plant_consumer
+        self.allocation = AllocationMatrix(self.plant_consumer)
+        self.months = sorted(
+            set(self.generations.months) | set(self.consumptions.months)
+        )
+
+        # Months are summarized and settled one at a time, so only the
+        # partition LRU and one month's settlement, never the whole history,
+        # are held in memory.
+        summaries, settled = summaries or {}, settled or {}
+        self.summaries: dict[str, MonthSummary] = {}
+        self.settled: dict[str, pd.DataFrame] = {}
+        for month in self.months:
+            self.summaries[month] = summaries.get(month) or summarize_month(
+                self.generations.month(month), self.consumptions.month(month)
+            )
+            if month in settled:
+                self.settled[month] = settled[month]
+            else:
+                self.settled[month] = self.settle_month(month).summary()
+        self.settlement_summary = sum_summaries(list(self.settled.values()))
+        parts = list(self.summaries.values())
+        self.generation_totals = PrefixSums(
+            _concat_totals(
+                [part.generation_totals for part in parts], GENERATION_MEASURES
+            ),
+            GENERATION_MEASURES,
+        )
+        self.consumption_totals = PrefixSums(
+            _concat_totals(
+                [part.consumption_totals for part in parts], CONSUMPTION_MEASURES
+            ),
+            CONSUMPTION_MEASURES,
+        )
+        self.generation_rollup = RollupCube(
+            self.generations, [part.cells for part in parts]
+        )
+        self.consumers = sorted(set().union(*(part.consumers for part in parts)))
+
+    @property
+    def monthly_generation(self) -> pd.DataFrame:
+        """Generation summed by month, plant, supplier and generation mix."""
+        _, cells = self.generation_rollup.levels["M"]
+        return cells
+
+    def settle_month(self, month: str) -> Settlement:
+        """Expected vs actual consumption of every consumer over one month."""
+        return compute_settlement(
+            self.generations.month(month),
+            self.consumptions.month(month),
+            self.allocation,
+        )
+
+    def consumer_day(self, consumer: str, date) -> pd.DataFrame:
+        """Expected, Actual and Imbalance of one consumer, by hour of one date."""
+        settlement = compute_settlement(
+            self.generations.day(date), self.consumptions.day(date), self.allocation
+        )
+        return settlement.consumer_day(consumer, date)
+
+    @property
+    def bounds(self) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """Earliest and latest datetime across generations and consumptions."""
+        bounds = [
+            frame.bounds
+            for frame in (self.generations, self.consumptions)
+            if frame.bounds is not None
+        ]
+        if not bounds:
+            return None
+        return min(start for start, _ in bounds), max(end for _, end in bounds)
+
+
+def register_dataset(dataset_id: str, uploaded_data: UploadedData) -> Dataset:
+    """
+    Make an uploaded dataset available to every callback under its ID.
+
+    Args:
+        dataset_id: Content digest of the uploaded workbook
+        uploaded_data: Processed frames of the upload
+
+    Returns:
+        The registered Dataset
+    """
+    dataset_cache.put(
+        dataset_id, normalize_dtypes(uploaded_data), pinned=_datasets.keys()
+    )
+    dataset = _load_cached_dataset(dataset_id)
+    if dataset is None:
+        raise OSError("the dataset could not be written to the cache")
+    _datasets.put(dataset_id, dataset)
+    return dataset
+
+
+def _merge_months(
+    table: PartitionedFrame, delta: pd.DataFrame, keys: list[str]
+) -> tuple[pd.DataFrame, list[str], np.ndarray]:
+    """
+    Merge delta readings into the months of a table they fall in.
+
+    Returns:
+        The merged rows of those months, the months, and the Datetime of
+        every existing row the delta replaced
+    """
+    merged, restated = [], [np.array([], dtype="datetime64[ns]")]
+    months = split_months(delta)
+    for month, rows in months.items():
+        frame, replaced = TimeIndexedFrame(table.month(month)).merge(rows, keys)
+        merged.append(frame.frame)
+        restated.append(replaced["Datetime"].to_numpy(dtype="datetime64[ns]"))
+    rows = concat_frames(merged) if merged else delta
+    return rows, list(months), np.concatenate(restated)
+
+
+def append_dataset(
+    base: Dataset, dataset_id: str, delta: UploadedData
+) -> tuple[Dataset, int]:
+    """
+    Register the dataset made by appending a delta workbook to a base dataset.
+
+    Readings of the delta are added, replacing existing readings of the
+    same hour and plant or consumer. Only the months the delta falls in are
+    merged, written to the cache, summarized and settled again; the other
+    months are linked from the base entry and keep their summaries and
+    settlement. Contracts in the delta replace the contract register, which
+    makes every month be settled again.
+
+    Args:
+        base: Dataset the delta is appended to
+        dataset_id: ID of the new dataset, see `append_digest`
+        delta: Frames loaded with `load_from_excel(..., delta=True)`
+
+    Returns:
+        The registered Dataset and its number of restated hours, i.e. hours
+        that already had a reading the delta replaced
+    """
+    delta = normalize_dtypes(delta)
+    generations, generation_months, restated_generations = _merge_months(
+        base.generations, delta.generations, GENERATION_ID_COLUMNS
+    )
+    consumptions, consumption_months, restated_consumptions = _merge_months(
+        base.consumptions, delta.consumptions, CONSUMPTION_ID_COLUMNS
+    )
+    contracts_changed = not delta.plant_consumer.empty
+    plant_consumer = delta.plant_consumer if contracts_changed else base.plant_consumer
+
+    dataset_cache.put(
+        dataset_id,
+        UploadedData(generations, consumptions, plant_consumer),
+        base=base.id,
+        pinned=_datasets.keys(),
+    )
+    tables = dataset_cache.get(dataset_id)
+    if tables is None:
+        raise OSError("the dataset could not be written to the cache")
+
+    changed = set(generation_months) | set(consumption_months)
+    unchanged = [month for month in base.months if month not in changed]
+    settled = {} if contracts_changed else {m: base.settled[m] for m in unchanged}
+    dataset = Dataset(
+        dataset_id,
+        tables,
+        {month: base.summaries[month] for month in unchanged},
+        settled,
+    )
+    _store_summaries(dataset)
+    _datasets.put(dataset_id, dataset)
+
+    restated_hours = len(np.union1d(restated_generations, restated_consumptions))
+    return dataset, restated_hours
+
+
+def _store_summaries(dataset: Dataset) -> None:
+    if dataset.months:
+        dataset_cache.put_summaries(
+            dataset.id, _pack_summaries(dataset.summaries, dataset.settled)
+        )
+
+
+def _load_cached_dataset(dataset_id: str) -> Dataset | None:
+    tables = dataset_cache.get(dataset_id)
+    if tables is None:
+        return None
+    frames = dataset_cache.get_summaries(dataset_id)
+    if frames is not None:
+        return Dataset(dataset_id, tables, *_unpack_summaries(frames))
+    dataset = Dataset(dataset_id, tables)
+    _store_summaries(dataset)
+    return dataset
+
+
+def get_dataset(dataset_id: str | None) -> Dataset | None:
+    """
+    Resolve a dataset ID to its loaded Dataset.
+
+    Every hit marks the dataset's cache entry as recently used, so the
+    eviction of other workers, which cannot see this process's pins, spares
+    it while it is in use.
+
+    Returns:
+        Dataset, or None if the ID is empty or no longer cached
+    """
+    if not dataset_id:
+        return None
+    dataset = _datasets.get_or_load(
+        dataset_id, lambda: _load_cached_dataset(dataset_id)
+    )
+    if dataset is not None and not dataset_cache.touch(dataset_id):
+        # Evicted by another worker: its month partitions are gone.
+        _datasets.discard(dataset_id)
+        return None
+    return dataset
+
+
+def dataset_cache_info() -> CacheInfo:
+    """Return hit and miss counters of the in-memory dataset cache."""
+    return _datasets.info()
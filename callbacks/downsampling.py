@@ -0,0 +1,131 @@
+"""
+Point budget for long time series charts.
+
+A year of hourly data is 8,760 points per trace, far more than a chart has
+horizontal pixels. When the visible span of a chart, which is its data's
+extent or the range zoomed to, holds more hours than
+`MAX_POINTS_PER_TRACE`, `downsample` splits it into half as many buckets of
+whole hours and keeps the minimum and the maximum of each bucket, so peaks
+and troughs survive. The buckets depend only on the span, and the two
+points of a bucket are drawn at its first and middle hour, clipped to the
+span, so the traces of a chart share their x values and still stack. The charts re-fetch the
+visible span when zoomed (see `zoomed_x_range`), so zooming in gets back to
+every hour while each response stays within the budget.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .time_index import to_naive_timestamp
+
+
+# Two points, a minimum and a maximum, per pixel of a chart ~1000 px wide.
+MAX_POINTS_PER_TRACE = 2000
+
+_HOUR = np.timedelta64(1, "h")
+
+
+def data_span(
+    times: pd.Index | pd.Series,
+    x_range: tuple[pd.Timestamp, pd.Timestamp] | None = None,
+) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    The span a chart shows: its data's first to last time, or the part of
+    the zoomed x range within them.
+    """
+    first, last = times.min(), times.max()
+    if x_range is None:
+        return first, last
+    return max(x_range[0], first), min(x_range[1], last)
+
+
+def downsample(
+    values: pd.Series,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    max_points: int = MAX_POINTS_PER_TRACE,
+) -> pd.Series:
+    """
+    An hourly series cut to the visible span and reduced to the point budget.
+
+    Args:
+        values: Series indexed by ascending, unique hourly Datetime
+        start: Start of the visible span
+        end: End of the visible span
+        max_points: Most points returned
+
+    Returns:
+        The hours from start to end, plus one either side so lines run to
+        the plot edges, or the minimum and maximum of each bucket when the
+        span holds more than max_points hours
+    """
+    if values.empty:
+        return values
+    origin = start.floor("h")
+    hours = int((end - origin) / pd.Timedelta(hours=1)) + 1
+    lo = values.index.searchsorted(start, side="left")
+    hi = values.index.searchsorted(end, side="right")
+    if hours <= max_points:
+        return values.iloc[max(lo - 1, 0) : hi + 1]
+
+    values = values.iloc[lo:hi]
+    width = -(-hours // (max_points // 2))
+    offsets = (values.index.to_numpy() - origin.to_datetime64()) // _HOUR
+    buckets, within = np.divmod(offsets.astype(np.int64), width)
+
+    grid = np.full((buckets.max(initial=0) + 1, width), np.nan)
+    grid[buckets, within] = values.to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(grid)
+    kept = ~missing.all(axis=1)
+    grid, missing = grid[kept], missing[kept]
+    lowest = np.where(missing, np.inf, grid).argmin(axis=1)
+    highest = np.where(missing, -np.inf, grid).argmax(axis=1)
+
+    rows = np.arange(len(grid))
+    points = np.stack(
+        [
+            grid[rows, np.minimum(lowest, highest)],
+            grid[rows, np.maximum(lowest, highest)],
+        ],
+        axis=1,
+    ).ravel()
+    firsts = np.flatnonzero(kept) * width
+    grid_hours = np.stack([firsts, firsts + width // 2], axis=1).ravel()
+    # The grid starts at the hour start falls in; keep it within the span.
+    times = np.clip(
+        origin.to_datetime64() + grid_hours * _HOUR,
+        start.to_datetime64(),
+        end.to_datetime64(),
+    )
+    return pd.Series(points, index=pd.DatetimeIndex(times), name=values.name)
+
+
+def changes_x_range(relayout_data: dict | None) -> bool:
+    """Whether a chart's relayoutData event zoomed, panned or reset the x axis."""
+    return bool(relayout_data) and any(
+        key.startswith(("xaxis.range", "xaxis.autorange")) for key in relayout_data
+    )
+
+
+def zoomed_x_range(
+    relayout_data: dict, start: pd.Timestamp, end: pd.Timestamp
+) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """
+    The x range a relayoutData event zoomed to, clipped to the window.
+
+    Returns:
+        The range, or None when the axis was reset or the range covers the
+        whole window
+    """
+    if "xaxis.range" in relayout_data:
+        x0, x1 = relayout_data["xaxis.range"]
+    elif "xaxis.range[0]" in relayout_data and "xaxis.range[1]" in relayout_data:
+        x0, x1 = relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    else:
+        return None
+
+    x0, x1 = sorted((to_naive_timestamp(x0), to_naive_timestamp(x1)))
+    x0, x1 = max(x0, start), min(x1, end)
+    if x0 <= start and x1 >= end:
+        return None
+    return x0, x1
@@ -0,0 +1,69 @@
+"""
+Memoized chart figures.
+
+A chart figure depends only on the dataset, the window and a few options
+such as the selected suppliers. Finished figures are kept as plain dicts
+in a per-process LRU, keyed by chart, dataset, window and those options
+and capped by count and estimated size, so returning to a view seen
+before skips the aggregation and plotly alike. Chart types are applied in
+the browser by assets/presentation.js.
+"""
+
+from collections.abc import Callable, Hashable
+
+import numpy as np
+import plotly.graph_objects as go
+
+from .lru_cache import CacheInfo, LRUCache
+
+
+MAX_FIGURES_IN_MEMORY = 64
+MAX_FIGURE_BYTES = 64 * 1024**2
+
+# Rough per-element size of object arrays, such as datetime axes.
+_OBJECT_BYTES = 64
+
+
+def figure_nbytes(value) -> int:
+    """Estimated size in bytes of a figure dict or of any part of one."""
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.size * _OBJECT_BYTES
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + figure_nbytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(figure_nbytes(item) for item in value)
+    return 8
+
+
+_figures = LRUCache(
+    MAX_FIGURES_IN_MEMORY, max_bytes=MAX_FIGURE_BYTES, sizeof=figure_nbytes
+)
+
+
+def memoized_figures(
+    key: Hashable, build: Callable[[], dict[str, go.Figure]]
+) -> dict[str, dict]:
+    """
+    Return the figures of a callback, building them only on a cache miss.
+
+    Args:
+        key: Chart name, dataset ID, window and every option the figures
+            depend on
+        build: Builds the callback's figures, keyed by output name
+
+    Returns:
+        The figures as dicts, keyed by output name
+    """
+    figures = _figures.get_or_load(
+        key, lambda: {name: figure.to_dict() for name, figure in build().items()}
+    )
+    return dict(figures)
+
+
+def figure_cache_info() -> CacheInfo:
+    """Return hit and miss counters of the in-memory figure cache."""
+    return _figures.info()
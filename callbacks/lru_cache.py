@@ -0,0 +1,142 @@
+"""
+Bounded, thread-safe LRU cache shared by the server-side caches.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    currbytes: int = 0
+
+
+class LRUCache:
+    """Mapping that keeps at most `maxsize` entries, evicting the least recently used."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ):
+        """
+        Args:
+            maxsize: Maximum number of entries
+            max_bytes: Optional cap on the summed `sizeof` of the entries.
+                A value larger than the cap on its own is not cached.
+            sizeof: Estimated size in bytes of a value, required with
+                `max_bytes`
+        """
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requires a sizeof function")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: dict[Hashable, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, counting a hit or a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh key, evicting the oldest entries beyond the caps."""
+        size = 0 if self.max_bytes is None else self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: Hashable) -> None:
+        if key in self._entries:
+            del self._entries[key]
+            self._bytes -= self._sizes.pop(key)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader once on a miss.
+
+        Concurrent callers asking for the same missing key wait for a single
+        load instead of each running loader. Only the caller that loads
+        counts a miss; callers that waited and got its value count hits. A
+        loader result of None is not cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                else:
+                    self._misses += 1
+            if value is None:
+                value = loader()
+                if value is not None:
+                    self.put(key, value)
+
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        """Drop key if it is cached."""
+        with self._lock:
+            self._discard(key)
+
+    def keys(self) -> list[Hashable]:
+        """Return the cached keys, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def info(self) -> CacheInfo:
+        """Return hit and miss counters along with the current size."""
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.maxsize,
+                currsize=len(self._entries),
+                currbytes=self._bytes,
+            )
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
@@ -1,8 +1,8 @@
-from io import StringIO
-
 from dash import callback, Output, Input, State
 from dash.exceptions import PreventUpdate
-import pandas as pd
+
+from .datasets import get_dataset
+from .window_aggregates import window_aggregates
 
 
 @callback(
@@ -15,8 +15,7 @@ import pandas as pd
         pathname=Input("pathname", "href"),
         start_datetime=Input("start-datetime", "value"),
         end_datetime=Input("end-datetime", "value"),
-        generations_json=State("generations-store", "data"),
-        consumptions_json=State("consumptions-store", "data"),
+        dataset_id=State("dataset-store", "data"),
     ),
     prevent_initial_call=True,
 )
@@ -24,10 +23,10 @@ def update_metrics(
     pathname,
     start_datetime,
     end_datetime,
-    generations_json,
-    consumptions_json,
+    dataset_id,
 ):
-    if not all([generations_json, consumptions_json]):
+    dataset = get_dataset(dataset_id)
+    if dataset is None:
         raise PreventUpdate
 
     if not all([start_datetime, end_datetime]):
@@ -37,27 +36,9 @@ def update_metrics(
             loss_percentage="Select start and end periods",
         )
 
-    generations = pd.read_json(StringIO(generations_json), orient="split")
-    consumptions = pd.read_json(StringIO(consumptions_json), orient="split")
-
-    generations["Datetime"] = pd.to_datetime(generations["Datetime"], utc=True)
-    consumptions["Datetime"] = pd.to_datetime(consumptions["Datetime"], utc=True)
-    end_datetime = pd.to_datetime(end_datetime, utc=True)
-    start_datetime = pd.to_datetime(start_datetime, utc=True)
-
-    generations = generations[
-        (generations["Datetime"] >= start_datetime)
-        & (generations["Datetime"] <= end_datetime)
-    ]
-    consumptions = consumptions[
-        (consumptions["Datetime"] >= start_datetime)
-        & (consumptions["Datetime"] <= end_datetime)
-    ]
-
-    total_generation = generations["Generation"].sum()
-    total_generator_consumption = generations["Gen_Consumption"].sum()
-    total_actual_consumption = consumptions["Consumption"].sum()
-    total_consumption = total_generator_consumption + total_actual_consumption
+    aggregates = window_aggregates(dataset, start_datetime, end_datetime)
+    total_generation = aggregates.total_generation
+    total_consumption = aggregates.total_gen_consumption + aggregates.total_consumption
 
     loss_pct = 0
     if total_generation > 0:
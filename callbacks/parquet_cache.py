@@ -0,0 +1,248 @@
+"""
+Content-addressed Parquet cache for uploaded workbooks.
+
+Each upload is keyed by the SHA-256 of its bytes, and the processed
+UploadedData frames are stored as Parquet under that key: the
+generations and consumptions as one file per month (see partitions.py),
+the contracts as one file. A repeat upload of the same workbook opens the
+columnar files instead of parsing and resampling the Excel sheets again.
+An entry also keeps the summaries its dataset was built with, so a cold
+load reads a few small files instead of every month partition.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+from collections.abc import Collection
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from .codec import frame_from_bytes, frame_to_bytes
+from .data_loader import EMPTY_FRAME_COLUMNS, UploadedData
+from .partitions import PartitionedFrame, split_months
+
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "datasets"
+CACHE_MAX_BYTES = 2 * 1024**3
+
+PARTITIONED_FRAMES = ("generations", "consumptions")
+SUMMARIES_DIR = "summaries"
+
+_DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def content_digest(file_content: bytes) -> str:
+    """Return the SHA-256 hex digest used as the cache key for an upload."""
+    return hashlib.sha256(file_content).hexdigest()
+
+
+def append_digest(base_digest: str, delta_digest: str) -> str:
+    """Return the cache key of a dataset with a delta workbook appended."""
+    return content_digest(f"{base_digest}+{delta_digest}".encode())
+
+
+@dataclass(frozen=True, slots=True)
+class CachedDataset:
+    generations: PartitionedFrame
+    consumptions: PartitionedFrame
+    plant_consumer: pd.DataFrame
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class ParquetCache:
+    """On-disk Parquet cache of UploadedData with a size cap and LRU eviction."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _entry_dir(self, digest: str) -> Path:
+        return self.directory / digest
+
+    def get(self, digest: str) -> CachedDataset | None:
+        """
+        Open the cached tables of a digest, marking the entry as recently used.
+
+        Only the contracts are read here; month partitions are read when
+        queried.
+
+        Returns:
+            CachedDataset, or None if the digest is not cached
+        """
+        # Digests arrive from the browser, so never let one escape the cache.
+        if not _DIGEST_PATTERN.fullmatch(digest):
+            return None
+
+        entry = self._entry_dir(digest)
+        contracts = entry / "plant_consumer.parquet"
+        if not contracts.exists() or not all(
+            (entry / name).is_dir() for name in PARTITIONED_FRAMES
+        ):
+            return None
+
+        try:
+            plant_consumer = frame_from_bytes(contracts.read_bytes())
+        except (OSError, ValueError):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Directory mtime doubles as the last-access time for eviction.
+        os.utime(entry)
+        return CachedDataset(
+            *(
+                PartitionedFrame(entry / name, EMPTY_FRAME_COLUMNS[name])
+                for name in PARTITIONED_FRAMES
+            ),
+            plant_consumer=plant_consumer,
+        )
+
+    def put_summaries(self, digest: str, frames: dict[str, pd.DataFrame]) -> None:
+        """
+        Store the summary frames of a cached entry, unless it already has them.
+
+        Args:
+            digest: Cache key of the entry
+            frames: Summary frames by name
+        """
+        entry = self._entry_dir(digest)
+        if not entry.is_dir() or (entry / SUMMARIES_DIR).exists():
+            return
+
+        staging = entry / f".{SUMMARIES_DIR}.{os.getpid()}.tmp"
+        try:
+            staging.mkdir()
+            for name, frame in frames.items():
+                (staging / f"{name}.parquet").write_bytes(frame_to_bytes(frame))
+            staging.rename(entry / SUMMARIES_DIR)
+        except OSError:
+            # The entry was evicted, or another worker stored them first.
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def get_summaries(self, digest: str) -> dict[str, pd.DataFrame] | None:
+        """
+        Read the summary frames of a cached entry.
+
+        Returns:
+            Summary frames by name, or None if the entry has none
+        """
+        if not _DIGEST_PATTERN.fullmatch(digest):
+            return None
+        summaries = self._entry_dir(digest) / SUMMARIES_DIR
+        try:
+            return {
+                path.stem: frame_from_bytes(path.read_bytes())
+                for path in summaries.glob("*.parquet")
+            } or None
+        except (OSError, ValueError):
+            return None
+
+    def touch(self, digest: str) -> bool:
+        """
+        Mark a cached entry as recently used.
+
+        Returns:
+            False if the entry is no longer cached
+        """
+        try:
+            os.utime(self._entry_dir(digest))
+        except OSError:
+            return False
+        return True
+
+    def put(
+        self,
+        digest: str,
+        uploaded_data: UploadedData,
+        base: str | None = None,
+        pinned: Collection[str] = (),
+    ) -> None:
+        """
+        Store the frames of an upload, then evict entries over the size cap.
+
+        Args:
+            digest: Cache key of the upload
+            uploaded_data: Frames to store
+            base: Cached digest the upload was derived from. Its generations
+                and consumptions are linked into the new entry, except for
+                the months `uploaded_data` holds, which replace them.
+            pinned: Digests of datasets in use, which are not evicted
+        """
+        entry = self._entry_dir(digest)
+        if entry.exists():
+            os.utime(entry)
+            return
+
+        staging = self.directory / f".{digest}.{os.getpid()}.tmp"
+        staging.mkdir(parents=True, exist_ok=True)
+        try:
+            for name in PARTITIONED_FRAMES:
+                partitions = staging / name
+                partitions.mkdir()
+                months = split_months(getattr(uploaded_data, name))
+                if base is not None:
+                    for path in (self._entry_dir(base) / name).glob("*.parquet"):
+                        if path.stem not in months:
+                            _link_or_copy(path, partitions / path.name)
+                for month, frame in months.items():
+                    (partitions / f"{month}.parquet").write_bytes(frame_to_bytes(frame))
+            (staging / "plant_consumer.parquet").write_bytes(
+                frame_to_bytes(uploaded_data.plant_consumer)
+            )
+            staging.rename(entry)
+        except OSError:
+            # Another worker cached the same upload first.
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict(keep={digest, *pinned})
+
+    def evict(self, keep: Collection[str] = ()) -> None:
+        """
+        Delete least recently used entries until the cache fits max_bytes.
+
+        Entries share the month partitions they were appended from as
+        hardlinks, so each file is counted once, and only towards the space
+        freed by deleting the last entry linking it.
+
+        Args:
+            keep: Digests of entries never to delete
+        """
+        if not self.directory.exists():
+            return
+
+        entries = []
+        files: dict[tuple[int, int], tuple[int, set[Path]]] = {}
+        for entry in self.directory.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            inodes = []
+            for path in entry.rglob("*.parquet"):
+                stat = path.stat()
+                inode = (stat.st_dev, stat.st_ino)
+                files.setdefault(inode, (stat.st_size, set()))[1].add(entry)
+                inodes.append(inode)
+            entries.append((entry.stat().st_mtime, entry, inodes))
+
+        total = sum(size for size, _ in files.values())
+        for _, entry, inodes in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name in keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            for inode in inodes:
+                size, linked_from = files[inode]
+                linked_from.discard(entry)
+                if not linked_from:
+                    total -= size
+
+
+dataset_cache = ParquetCache(CACHE_DIR, CACHE_MAX_BYTES)
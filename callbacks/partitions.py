@@ -0,0 +1,113 @@
+"""
+Month-partitioned hourly tables.
+
+The generations and consumptions of a cached dataset are stored as one
+Parquet file per calendar month, named YYYY-MM.parquet. A PartitionedFrame
+presents such a directory as one time-sorted table: a window query reads
+only the months it overlaps, through a per-process LRU of recently read
+months, so a worker never has to hold years of hourly rows to chart a few
+days of them.
+"""
+
+import bisect
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .codec import frame_from_bytes
+from .lru_cache import CacheInfo, LRUCache
+from .time_index import (
+    concat_frames,
+    day_bounds,
+    to_naive_timestamp,
+    window_positions,
+)
+
+
+MAX_PARTITIONS_IN_MEMORY = 24
+
+_partitions = LRUCache(MAX_PARTITIONS_IN_MEMORY)
+
+
+def month_key(timestamp) -> str:
+    """Partition name of the month holding a timestamp, e.g. "2024-01"."""
+    timestamp = to_naive_timestamp(timestamp)
+    return f"{timestamp.year:04d}-{timestamp.month:02d}"
+
+
+def month_span(key: str) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """Start of a partition's month and of the month after it."""
+    start = pd.Timestamp(f"{key}-01")
+    return start, start + pd.offsets.MonthBegin(1)
+
+
+def split_months(
+    frame: pd.DataFrame, column: str = "Datetime"
+) -> dict[str, pd.DataFrame]:
+    """Split a frame into time-sorted frames, one per calendar month."""
+    frame = frame.sort_values(column, kind="stable")
+    months = frame[column].to_numpy(dtype="datetime64[ns]").astype("datetime64[M]")
+    edges = np.flatnonzero(months[1:] != months[:-1]) + 1
+    starts = np.concatenate(([0], edges))
+    stops = np.concatenate((edges, [len(frame)]))
+    return {
+        str(months[start]): frame.iloc[start:stop].reset_index(drop=True)
+        for start, stop in zip(starts, stops)
+        if stop > start
+    }
+
+
+class PartitionedFrame:
+    """Time-sorted table stored as one Parquet file per month."""
+
+    def __init__(self, directory: Path, columns: list[str], column: str = "Datetime"):
+        self.directory = Path(directory)
+        self.columns = columns
+        self.column = column
+        self.months = sorted(path.stem for path in self.directory.glob("*.parquet"))
+
+    def month(self, key: str) -> pd.DataFrame:
+        """Rows of one month, empty if the table has none that month."""
+        if key not in self.months:
+            return self._empty()
+        path = self.directory / f"{key}.parquet"
+        return _partitions.get_or_load(
+            path, lambda: frame_from_bytes(path.read_bytes())
+        )
+
+    def _empty(self) -> pd.DataFrame:
+        if not self.months:
+            return pd.DataFrame(columns=self.columns)
+        return self.month(self.months[0]).iloc[:0]
+
+    def window(self, start, end) -> pd.DataFrame:
+        """Rows with start <= Datetime <= end, read from overlapping months only."""
+        lo = bisect.bisect_left(self.months, month_key(start))
+        hi = bisect.bisect_right(self.months, month_key(end))
+        parts = [self.month(key) for key in self.months[lo:hi]]
+        if not parts:
+            return self._empty()
+        frame = parts[0] if len(parts) == 1 else concat_frames(parts)
+        times = frame[self.column].to_numpy(dtype="datetime64[ns]")
+        lo, hi = window_positions(times, start, end)
+        return frame.iloc[lo:hi]
+
+    def day(self, date) -> pd.DataFrame:
+        """Rows falling on the given calendar date."""
+        return self.window(*day_bounds(date))
+
+    @cached_property
+    def bounds(self) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """First and last datetime, or None when the table is empty."""
+        if not self.months:
+            return None
+        first = self.month(self.months[0])[self.column]
+        last = self.month(self.months[-1])[self.column]
+        return pd.Timestamp(first.iloc[0]), pd.Timestamp(last.iloc[-1])
+
+
+def partition_cache_info() -> CacheInfo:
+    """Return hit and miss counters of the in-memory month partition cache."""
+    return _partitions.info()
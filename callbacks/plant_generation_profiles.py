@@ -1,10 +1,27 @@
-from io import StringIO
-
 import plotly.graph_objects as go
-from dash import callback, Output, Input, State
+from dash import (
+    callback,
+    clientside_callback,
+    ClientsideFunction,
+    ctx,
+    Output,
+    Input,
+    Patch,
+    State,
+)
 from dash.exceptions import PreventUpdate
-import pandas as pd
+
+from .datasets import get_dataset
+from .downsampling import (
+    changes_x_range,
+    data_span,
+    downsample,
+    zoomed_x_range,
+)
+from .figure_cache import memoized_figures
+from .time_index import to_naive_timestamp
 from .utitls import text_fig
+from .window_aggregates import window_plant_hours
 
 
 @callback(
@@ -27,28 +44,140 @@ def update_all_wholesale_suppliers_checkbox(
     return dict(wholesale_suppliers_select=global_state["wholesale_suppliers"])
 
 
+def _plant_generations(plant_hours, wholesale_suppliers):
+    """
+    Hourly generation of the plants of the selected suppliers.
+
+    Returns:
+        Generation by Plant and Datetime, and the plants by descending
+        total generation, which is the order of the chart's traces
+    """
+    generations = plant_hours[
+        plant_hours["Wholesale_Supplier"].isin(wholesale_suppliers)
+    ]
+    generations = (
+        generations.groupby(["Plant", "Datetime"], observed=True)["Generation"]
+        .sum()
+        .reset_index()
+    )
+    plant_totals = (
+        generations.groupby("Plant", observed=True)["Generation"]
+        .sum()
+        .sort_values(ascending=False)  # type: ignore[arg-type]
+    )
+    return generations, plant_totals.index.tolist()
+
+
+def _plant_trace(plant, generations, span) -> go.Scatter:
+    plant_data = generations[generations["Plant"] == plant]
+    plant_data = downsample(plant_data.set_index("Datetime")["Generation"], *span)
+    return go.Scatter(
+        x=plant_data.index,
+        y=plant_data.values,
+        mode="lines+text",
+        name=plant,
+        line=dict(width=3, shape="spline"),
+        textfont=dict(size=10),
+        hoveron="points+fills",
+        hovertemplate=(
+            "<b>%{fullData.name}</b><br>"
+            "Time: %{x|%b %d, %Y at %H:%M}<br>"
+            "Generation: %{y:.2f} mWh<extra></extra>"
+        ),
+    )
+
+
+def _build_chart(
+    dataset, wholesale_suppliers, start_datetime, end_datetime, x_range=None
+):
+    plant_hours = window_plant_hours(dataset, start_datetime, end_datetime)
+    generations, plants = _plant_generations(plant_hours, wholesale_suppliers)
+
+    fig = go.Figure()
+
+    # Drawn as a line chart; assets/presentation.js fills or stacks the
+    # traces for the other chart types.
+    span = data_span(plant_hours["Datetime"], x_range)
+    for plant in plants:
+        fig.add_trace(_plant_trace(plant, generations, span))
+
+    fig.update_layout(
+        title="Plant Generation Profiles",
+        xaxis_title="Datetime",
+        yaxis_title="Generation (mWh)",
+        showlegend=True,
+        # Keeps the user's zoom when the zoomed range is re-fetched.
+        uirevision=f"{dataset.id} {start_datetime} {end_datetime}",
+    )
+    return dict(plant_generation_profiles_figure=fig)
+
+
+def _patch_chart(plant_hours, shown, wholesale_suppliers, span):
+    """
+    Patch turning the chart shown into the chart of a new supplier selection.
+
+    Traces of plants no longer selected are deleted and traces of newly
+    selected plants inserted at their place in the trace order, so only
+    the change is sent.
+
+    Returns:
+        The Patch and the plants of the patched chart, or None when the
+        plants kept would change data or order, which takes a full figure
+    """
+    changed = set(shown["suppliers"]) ^ set(wholesale_suppliers)
+    changed_plants = set(
+        plant_hours.loc[plant_hours["Wholesale_Supplier"].isin(changed), "Plant"]
+    )
+    generations, plants = _plant_generations(plant_hours, wholesale_suppliers)
+    kept = set(shown["plants"]) & set(plants)
+    if kept & changed_plants:
+        return None
+    if [p for p in shown["plants"] if p in kept] != [p for p in plants if p in kept]:
+        return None
+
+    patch = Patch()
+    for i in reversed(range(len(shown["plants"]))):
+        if shown["plants"][i] not in kept:
+            del patch["data"][i]
+    for i, plant in enumerate(plants):
+        if plant not in kept:
+            figure = go.Figure(_plant_trace(plant, generations, span))
+            patch["data"].insert(i, figure.to_dict()["data"][0])
+    return patch, plants
+
+
 @callback(
     output=dict(
-        plant_generation_profiles_chart=Output(
-            "plant-generation-profiles-chart", "figure"
+        plant_generation_profiles_figure=Output(
+            "plant-generation-profiles-store", "data"
+        ),
+        plant_generation_profiles_shown=Output(
+            "plant-generation-profiles-shown", "data"
         ),
     ),
     inputs=dict(
-        generations_json=State("generations-store", "data"),
+        dataset_id=Input("dataset-store", "data"),
         wholesale_suppliers=Input("wholesale-suppliers-select", "value"),
         start_datetime=Input("start-datetime", "value"),
         end_datetime=Input("end-datetime", "value"),
-        graph_type=Input("plant-generation-profiles-graph-type", "value"),
+        shown=State("plant-generation-profiles-shown", "data"),
+        relayout_data=Input("plant-generation-profiles-chart", "relayoutData"),
     ),
 )
-def update_plant_generation_profiles_chart(
-    generations_json,
+def update_plant_generation_profiles_figure(
+    dataset_id,
     wholesale_suppliers,
     start_datetime,
     end_datetime,
-    graph_type,
+    shown,
+    relayout_data,
 ):
-    if not generations_json:
+    zoomed = ctx.triggered_id == "plant-generation-profiles-chart"
+    if zoomed and (shown is None or not changes_x_range(relayout_data)):
+        raise PreventUpdate
+
+    dataset = get_dataset(dataset_id)
+    if dataset is None:
         raise PreventUpdate
 
     if not wholesale_suppliers:
@@ -57,7 +186,10 @@ def update_plant_generation_profiles_chart(
             size=24,
             color="orange",
         )
-        return dict(plant_generation_profiles_chart=text_figure)
+        return dict(
+            plant_generation_profiles_figure=text_figure,
+            plant_generation_profiles_shown=None,
+        )
 
     wholesale_suppliers = (
         [wholesale_suppliers]
@@ -65,57 +197,78 @@ def update_plant_generation_profiles_chart(
         else wholesale_suppliers
     )
 
-    generations = pd.read_json(StringIO(generations_json), orient="split")
-    generations["Datetime"] = pd.to_datetime(generations["Datetime"], utc=True)
-
-    start_datetime = pd.to_datetime(start_datetime, utc=True)
-    end_datetime = pd.to_datetime(end_datetime, utc=True)
-    generations = generations[
-        (generations["Wholesale_Supplier"].isin(wholesale_suppliers))
-        & (generations["Datetime"] >= start_datetime)
-        & (generations["Datetime"] <= end_datetime)
-    ]
-    generations = (
-        generations.groupby(["Plant", "Datetime"])["Generation"].sum().reset_index()
+    start_datetime = to_naive_timestamp(start_datetime)
+    end_datetime = to_naive_timestamp(end_datetime)
+    same_window = shown is not None and (
+        shown["dataset"] == dataset.id
+        and shown["start"] == start_datetime.isoformat()
+        and shown["end"] == end_datetime.isoformat()
     )
-
-    fig = go.Figure()
-
-    plant_totals = (
-        generations.groupby("Plant")["Generation"].sum().sort_values(ascending=False)  # type: ignore[arg-type]
+    # A zoom re-fetches the visible range at full resolution; the range
+    # zoomed to is kept when the suppliers change and reset with the window.
+    if zoomed:
+        x_range = zoomed_x_range(relayout_data, start_datetime, end_datetime)
+    elif same_window and shown["x_range"] is not None:
+        x_range = tuple(map(to_naive_timestamp, shown["x_range"]))
+    else:
+        x_range = None
+    view = dict(
+        dataset=dataset.id,
+        start=start_datetime.isoformat(),
+        end=end_datetime.isoformat(),
+        x_range=x_range and [bound.isoformat() for bound in x_range],
+        suppliers=sorted(set(wholesale_suppliers)),
     )
-    plants = plant_totals.index.tolist()
 
-    for i, plant in enumerate(plants):
-        plant_data = generations[generations["Plant"] == plant]
-        fig.add_trace(
-            go.Scatter(
-                x=plant_data["Datetime"],
-                y=plant_data["Generation"],
-                mode="lines+text",
-                name=plant,
-                line=dict(width=3, shape="spline"),
-                textfont=dict(size=10),
-                hoveron="points+fills",
-                hovertemplate=(
-                    "<b>%{fullData.name}</b><br>"
-                    "Time: %{x|%b %d, %Y at %H:%M}<br>"
-                    "Generation: %{y:.2f} mWh<extra></extra>"
-                ),
-                fill=None
-                if graph_type == "line-chart"
-                else ("tozeroy" if i == 0 else "tonexty"),
-                stackgroup="one" if graph_type == "stacked-area-chart" else None,
-            )
+    if shown is not None and {key: shown[key] for key in view} == view:
+        raise PreventUpdate
+    # A supplier change within the same window and range only patches the
+    # traces.
+    if same_window and shown["x_range"] == view["x_range"]:
+        plant_hours = window_plant_hours(dataset, start_datetime, end_datetime)
+        patched = _patch_chart(
+            plant_hours,
+            shown,
+            wholesale_suppliers,
+            data_span(plant_hours["Datetime"], x_range),
         )
+        if patched is not None:
+            patch, plants = patched
+            return dict(
+                plant_generation_profiles_figure=patch,
+                plant_generation_profiles_shown=dict(view, plants=plants),
+            )
 
-    fig.update_layout(
-        title="Plant Generation Profiles",
-        xaxis_title="Datetime",
-        yaxis_title="Generation (mWh)",
-        showlegend=True,
+    figures = memoized_figures(
+        (
+            "plant_generation_profiles",
+            dataset.id,
+            start_datetime,
+            end_datetime,
+            tuple(view["suppliers"]),
+            x_range,
+        ),
+        lambda: _build_chart(
+            dataset, wholesale_suppliers, start_datetime, end_datetime, x_range
+        ),
+    )
+    figure = figures["plant_generation_profiles_figure"]
+    return dict(
+        plant_generation_profiles_figure=figure,
+        plant_generation_profiles_shown=dict(
+            view, plants=[trace["name"] for trace in figure["data"]]
+        ),
     )
-    return dict(plant_generation_profiles_chart=fig)
+
+
+clientside_callback(
+    ClientsideFunction(
+        namespace="presentation", function_name="plant_generation_profiles_chart"
+    ),
+    Output("plant-generation-profiles-chart", "figure"),
+    Input("plant-generation-profiles-store", "data"),
+    Input("plant-generation-profiles-graph-type", "value"),
+)
 
 
 import_me = True
@@ -0,0 +1,121 @@
+"""
+Pre-aggregated generation rollups for the generation mix and supplier charts.
+
+Generation is summed into day and month cells for every
+Plant × Wholesale_Supplier × Gen_Mix combination when a dataset is loaded,
+one month at a time. A window is answered from the coarsest cells that fit
+entirely inside it, with hourly rows summed only at its ragged edges, so a
+month-long window adds up a few dozen cells instead of every hourly row.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .time_index import concat_frames, to_naive_timestamp
+
+
+DIMENSIONS = ["Plant", "Wholesale_Supplier", "Gen_Mix"]
+MEASURES = ["Generation", "Gen_Consumption"]
+
+# numpy datetime units for the hour, day and month levels, finest first.
+# Hour cells are summed from the hourly rows when queried; the coarser
+# levels are stored.
+LEVELS = ("h", "D", "M")
+
+
+def _month_floor(timestamp: pd.Timestamp) -> pd.Timestamp:
+    return pd.Timestamp(timestamp.year, timestamp.month, 1)
+
+
+def _month_ceil(timestamp: pd.Timestamp) -> pd.Timestamp:
+    floor = _month_floor(timestamp)
+    return floor if floor == timestamp else floor + pd.offsets.MonthBegin(1)
+
+
+# Generations without rows, for the cells of a dataset without generation.
+_NO_CELLS = pd.DataFrame(
+    {"Datetime": pd.Series(dtype="datetime64[ns]")}
+    | {column: pd.Series(dtype="object") for column in DIMENSIONS}
+    | {column: pd.Series(dtype="float64") for column in MEASURES}
+)
+
+
+def _cell_starts(times: np.ndarray, unit: str) -> np.ndarray:
+    return times.astype(f"datetime64[{unit}]").astype("datetime64[ns]")
+
+
+def _level_cells(generations: pd.DataFrame, unit: str) -> pd.DataFrame:
+    """Generation summed into the cells of one level."""
+    times = generations["Datetime"].to_numpy(dtype="datetime64[ns]")
+    return (
+        generations[DIMENSIONS + MEASURES]
+        .assign(Datetime=_cell_starts(times, unit))
+        .groupby(["Datetime"] + DIMENSIONS, observed=True, dropna=False)[MEASURES]
+        .sum()
+        .reset_index()
+    )
+
+
+def month_cells(generations: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Day and month cells of the generations of one month."""
+    return {unit: _level_cells(generations, unit) for unit in LEVELS[1:]}
+
+
+class RollupCube:
+    """Generation cells at hour, day and month granularity."""
+
+    def __init__(self, hours, cells: list[dict[str, pd.DataFrame]]):
+        """
+        Args:
+            hours: Hourly generations queried for hour cells, anything with
+                a `window(start, end)` method such as a PartitionedFrame
+            cells: `month_cells` of every month, in time order
+        """
+        self.hours = hours
+        self.levels: dict[str, tuple[np.ndarray, pd.DataFrame]] = {}
+        for unit in LEVELS[1:]:
+            parts = [part[unit] for part in cells]
+            level = concat_frames(parts) if parts else _level_cells(_NO_CELLS, unit)
+            self.levels[unit] = (level["Datetime"].to_numpy(), level)
+
+    def _cells(self, unit: str, start: pd.Timestamp, stop: pd.Timestamp):
+        """Cells of one level starting in [start, stop)."""
+        if unit == "h":
+            hours = self.hours.window(start, stop - pd.Timedelta(1, "ns"))
+            return _level_cells(hours, unit)
+        times, cells = self.levels[unit]
+        lo = np.searchsorted(times, start.to_datetime64(), "left")
+        hi = np.searchsorted(times, stop.to_datetime64(), "left")
+        return cells.iloc[lo:hi]
+
+    def window_cells(self, start, end) -> pd.DataFrame:
+        """
+        Cells whose hours exactly cover start <= Datetime <= end.
+
+        Whole months inside the window come from the month level, whole
+        days around them from the day level and the remaining hours at
+        either edge from the hour level.
+        """
+        first_hour = to_naive_timestamp(start).ceil("h")
+        stop = to_naive_timestamp(end).floor("h") + pd.Timedelta(hours=1)
+        if stop <= first_hour:
+            return self._cells("h", first_hour, first_hour)
+
+        first_day, last_day = first_hour.ceil("D"), stop.floor("D")
+        if first_day >= last_day:
+            return self._cells("h", first_hour, stop)
+
+        parts = [
+            self._cells("h", first_hour, first_day),
+            self._cells("h", last_day, stop),
+        ]
+        first_month, last_month = _month_ceil(first_day), _month_floor(last_day)
+        if first_month < last_month:
+            parts += [
+                self._cells("D", first_day, first_month),
+                self._cells("M", first_month, last_month),
+                self._cells("D", last_month, last_day),
+            ]
+        else:
+            parts.append(self._cells("D", first_day, last_day))
+        return pd.concat(parts, ignore_index=True)
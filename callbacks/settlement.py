@@ -0,0 +1,117 @@
+"""
+Full-period settlement of expected against actual consumption.
+
+Expected consumption of every consumer and hour comes from one pass of the
+hour × plant generation matrix through the dataset's AllocationMatrix, and
+actual consumption from the hourly Load_Consumption readings. The
+imbalance is actual minus expected, so a positive value means the load
+drew more than its contracted share of generation. Datasets settle month
+by month and keep only each month's per-consumer totals, which
+sum_summaries adds up over the whole period.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .allocation import AllocationMatrix
+
+
+SUMMARY_COLUMNS = [
+    "Consumer",
+    "Actual Consumption (mWh)",
+    "Expected Consumption (mWh)",
+    "Imbalance (mWh)",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class Settlement:
+    hours: pd.DatetimeIndex
+    consumers: pd.Index
+    expected: np.ndarray
+    actual: np.ndarray
+
+    @property
+    def imbalance(self) -> np.ndarray:
+        """Actual minus expected consumption, hours × consumers."""
+        return self.actual - self.expected
+
+    def summary(self) -> pd.DataFrame:
+        """Per-consumer totals over the whole settlement period."""
+        return pd.DataFrame(
+            {
+                "Consumer": self.consumers,
+                "Actual Consumption (mWh)": self.actual.sum(axis=0),
+                "Expected Consumption (mWh)": self.expected.sum(axis=0),
+                "Imbalance (mWh)": self.imbalance.sum(axis=0),
+            }
+        )
+
+    def consumer_day(self, consumer: str, date) -> pd.DataFrame:
+        """Expected, Actual and Imbalance of one consumer, by hour of one date."""
+        day = pd.DataFrame(0.0, index=range(24), columns=["Expected", "Actual"])
+        column = self.consumers.get_indexer([consumer])[0]
+        if column >= 0:
+            start = pd.Timestamp(date).normalize()
+            lo, hi = self.hours.searchsorted([start, start + pd.Timedelta(days=1)])
+            hours = self.hours[lo:hi].hour
+            day.loc[hours, "Expected"] = self.expected[lo:hi, column]
+            day.loc[hours, "Actual"] = self.actual[lo:hi, column]
+        day["Imbalance"] = day["Actual"] - day["Expected"]
+        return day
+
+
+def compute_settlement(
+    generations: pd.DataFrame,
+    consumptions: pd.DataFrame,
+    allocation: AllocationMatrix,
+) -> Settlement:
+    """
+    Settle every consumer over every hour of a dataset.
+
+    Args:
+        generations: Hourly generations (Datetime, Plant, Generation)
+        consumptions: Hourly consumptions (Datetime, Consumer, Consumption)
+        allocation: Compiled Contract_Register of the dataset
+
+    Returns:
+        Settlement over the union of generation and consumption hours and
+        of contracted and metered consumers
+    """
+    expected = allocation.expected_consumption(generations)
+    actual = (
+        consumptions.groupby(["Datetime", "Consumer"], observed=True)["Consumption"]
+        .sum()
+        .unstack("Consumer")
+    )
+
+    # Hours without generation are expected to consume nothing.
+    hours = expected.index.union(actual.index)
+    consumers = pd.Index(allocation.consumers).union(actual.columns)
+    return Settlement(
+        hours=hours,
+        consumers=consumers,
+        expected=expected.reindex(
+            index=hours, columns=consumers, fill_value=0
+        ).to_numpy(),
+        actual=actual.reindex(index=hours, columns=consumers).fillna(0).to_numpy(),
+    )
+
+
+def sum_summaries(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Add up Settlement.summary() frames of non-overlapping periods.
+
+    Consumers missing from a part are settled at 0 over its hours, as
+    compute_settlement does for the whole period.
+    """
+    if not parts:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby("Consumer", sort=True)[SUMMARY_COLUMNS[1:]]
+        .sum()
+        .reset_index()
+    )
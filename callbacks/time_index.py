@@ -0,0 +1,143 @@
+"""
+Time-sorted frames with binary-search window slicing.
+
+Range callbacks slice the hourly generations and consumptions by the
+start/end pickers. Keeping each frame sorted by Datetime lets a window be
+located with two `searchsorted` calls instead of full-column boolean masks,
+and cumulative sums over the per-hour totals turn window totals into two
+lookups and a subtraction.
+"""
+
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+
+def to_naive_timestamp(value) -> pd.Timestamp:
+    """
+    Parse a picker value into a tz-naive Timestamp.
+
+    Timezone-aware values are converted to UTC first, matching the tz-naive
+    UTC datetimes held by the datasets.
+    """
+    timestamp = pd.Timestamp(value)
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp
+
+
+def window_positions(times: np.ndarray, start, end) -> tuple[int, int]:
+    """Positions [lo, hi) of sorted `times` covering start <= time <= end."""
+    start = to_naive_timestamp(start).to_datetime64()
+    end = to_naive_timestamp(end).to_datetime64()
+    lo = int(np.searchsorted(times, start, "left"))
+    hi = int(np.searchsorted(times, end, "right"))
+    return lo, max(lo, hi)
+
+
+def day_bounds(date) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """First and last instant of the calendar date holding `date`."""
+    start = to_naive_timestamp(date).normalize()
+    return start, start + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate frames, keeping their categorical columns categorical.
+
+    pd.concat falls back to object columns when categories differ, so each
+    categorical column is first recoded to the sorted union of categories.
+    """
+    for name, dtype in frames[0].dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        categories = reduce(
+            pd.Index.union, (frame[name].cat.categories for frame in frames)
+        )
+        union = pd.CategoricalDtype(categories)
+        frames = [
+            frame if frame[name].dtype == union else frame.astype({name: union})
+            for frame in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+class TimeIndexedFrame:
+    """DataFrame kept sorted by a datetime column, merged by binary search."""
+
+    def __init__(self, frame: pd.DataFrame, column: str = "Datetime"):
+        self.column = column
+        self.frame = frame.sort_values(column, kind="stable").reset_index(drop=True)
+        self.times = self.frame[column].to_numpy(dtype="datetime64[ns]")
+
+    def merge(
+        self, delta: pd.DataFrame, keys: list[str]
+    ) -> tuple["TimeIndexedFrame", pd.DataFrame]:
+        """
+        Merge new or restated readings into a copy of the frame.
+
+        A delta row replaces the existing row of the same Datetime and keys.
+        Only rows from the first Datetime of the delta on are compared and
+        re-sorted, so the cost follows the delta, not the frame.
+
+        Args:
+            delta: Readings with the frame's columns
+            keys: Columns identifying the series a reading belongs to
+
+        Returns:
+            The merged frame and the existing rows the delta replaced
+        """
+        if delta.empty:
+            return self, self.frame.iloc[:0]
+        if self.frame.empty:
+            return TimeIndexedFrame(delta), delta.iloc[:0]
+
+        start = delta[self.column].min()
+        lo = int(np.searchsorted(self.times, start.to_datetime64(), "left"))
+        head, tail = self.frame.iloc[:lo], self.frame.iloc[lo:]
+        columns = [self.column, *keys]
+        restated = pd.MultiIndex.from_frame(tail[columns]).isin(
+            pd.MultiIndex.from_frame(delta[columns])
+        )
+        delta = delta[self.frame.columns].astype(
+            {
+                name: dtype
+                for name, dtype in self.frame.dtypes.items()
+                if not isinstance(dtype, pd.CategoricalDtype)
+            }
+        )
+        tail = concat_frames([tail[~restated], delta])
+        # Within an hour rows stay ordered by their keys, as in a full load.
+        tail = tail.sort_values(columns, kind="stable")
+
+        merged = TimeIndexedFrame.__new__(TimeIndexedFrame)
+        merged.column = self.column
+        merged.frame = concat_frames([head, tail])
+        merged.times = merged.frame[self.column].to_numpy(dtype="datetime64[ns]")
+        return merged, self.frame.iloc[lo:][restated]
+
+
+class PrefixSums:
+    """Cumulative per-timestamp totals answering any window sum in O(log n)."""
+
+    def __init__(self, frame: pd.DataFrame, columns: list[str], column="Datetime"):
+        self.totals = frame.groupby(column)[columns].sum()
+        self.times = self.totals.index.to_numpy(dtype="datetime64[ns]")
+        self.cumulative = {
+            name: np.concatenate(
+                ([0.0], self.totals[name].to_numpy(dtype="float64").cumsum())
+            )
+            for name in columns
+        }
+
+    def sum(self, column: str, start, end) -> float:
+        """Total of `column` over start <= Datetime <= end."""
+        lo, hi = window_positions(self.times, start, end)
+        cumulative = self.cumulative[column]
+        return float(cumulative[hi] - cumulative[lo])
+
+    def window(self, start, end) -> pd.DataFrame:
+        """Per-timestamp totals over start <= Datetime <= end."""
+        lo, hi = window_positions(self.times, start, end)
+        return self.totals.iloc[lo:hi]
@@ -1,58 +1,38 @@
-from io import StringIO
-
-from dash import callback, Output, Input, State
-import pandas as pd
+from dash import callback, ctx, Output, Input
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
 
+from .datasets import get_dataset
+from .downsampling import (
+    changes_x_range,
+    data_span,
+    downsample,
+    zoomed_x_range,
+)
+from .figure_cache import memoized_figures
+from .time_index import to_naive_timestamp
 from .utitls import text_fig
+from .window_aggregates import window_aggregates
 
 
-@callback(
-    output=dict(
-        summary_time_series_chart=Output("summary-time-series-chart", "figure"),
-    ),
-    inputs=dict(
-        generations_json=State("generations-store", "data"),
-        consumptions_json=State("consumptions-store", "data"),
-        start_dt=Input("start-datetime", "value"),
-        end_dt=Input("end-datetime", "value"),
-    ),
-)
-def build_summary_time_series_chart(
-    generations_json: str | None,
-    consumptions_json: str | None,
-    start_dt: str | None,
-    end_dt: str | None,
-):
-    if not generations_json or not consumptions_json or not start_dt or not end_dt:
-        return dict(summary_time_series_chart=text_fig("No data available!", size=24))
-    generations = pd.read_json(StringIO(generations_json), orient="split")
-    consumptions = pd.read_json(StringIO(consumptions_json), orient="split")
-    start_datetime = pd.to_datetime(start_dt)
-    end_datetime = pd.to_datetime(end_dt)
-
-    filtered_generations = generations[
-        (generations["Datetime"] >= start_datetime)
-        & (generations["Datetime"] <= end_datetime)
-    ]
-    filtered_consumptions = consumptions[
-        (consumptions["Datetime"] >= start_datetime)
-        & (consumptions["Datetime"] <= end_datetime)
-    ]
-
-    gen_timeseries = filtered_generations.groupby("Datetime")["Generation"].sum()
-
-    actual_cons_timeseries = filtered_consumptions.groupby("Datetime")[
-        "Consumption"
-    ].sum()
-    gen_cons_timeseries = filtered_generations.groupby("Datetime")[
-        "Gen_Consumption"
-    ].sum()
+def _build_chart(dataset, start_dt, end_dt, x_range=None):
+    aggregates = window_aggregates(dataset, start_dt, end_dt)
+    gen_timeseries = aggregates.hourly_generation["Generation"]
+    actual_cons_timeseries = aggregates.hourly_consumption["Consumption"]
+    gen_cons_timeseries = aggregates.hourly_generation["Gen_Consumption"]
     total_cons_timeseries = actual_cons_timeseries.add(
         gen_cons_timeseries, fill_value=0
     )
 
     loss_pcts = ((gen_timeseries - total_cons_timeseries) / gen_timeseries) * 100
+    two_times_max_loss_pct = loss_pcts.max() * 2
+    loss_range = [-two_times_max_loss_pct, two_times_max_loss_pct]
+
+    # Only the zoomed range, within the point budget, is sent.
+    span = data_span(loss_pcts.index, x_range)
+    gen_timeseries = downsample(gen_timeseries, *span)
+    total_cons_timeseries = downsample(total_cons_timeseries, *span)
+    loss_pcts = downsample(loss_pcts, *span)
 
     fig = go.Figure()
 
@@ -88,9 +68,6 @@ def build_summary_time_series_chart(
         )
     )
 
-    two_times_max_loss_pct = loss_pcts.max() * 2
-    loss_range = [-two_times_max_loss_pct, two_times_max_loss_pct]
-
     fig.update_layout(
         template="plotly_white",
         hovermode="x unified",
@@ -120,9 +97,45 @@ def build_summary_time_series_chart(
             x=0.5,
         ),
         margin=dict(l=40, r=40, t=40, b=40),
+        # Keeps the user's zoom when the zoomed range is re-fetched.
+        uirevision=f"{dataset.id} {start_dt} {end_dt}",
     )
 
     return dict(summary_time_series_chart=fig)
 
 
+@callback(
+    output=dict(
+        summary_time_series_chart=Output("summary-time-series-chart", "figure"),
+    ),
+    inputs=dict(
+        dataset_id=Input("dataset-store", "data"),
+        start_dt=Input("start-datetime", "value"),
+        end_dt=Input("end-datetime", "value"),
+        relayout_data=Input("summary-time-series-chart", "relayoutData"),
+    ),
+)
+def build_summary_time_series_chart(
+    dataset_id: str | None,
+    start_dt: str | None,
+    end_dt: str | None,
+    relayout_data: dict | None,
+):
+    zoomed = ctx.triggered_id == "summary-time-series-chart"
+    if zoomed and not changes_x_range(relayout_data):
+        raise PreventUpdate
+
+    dataset = get_dataset(dataset_id)
+    if dataset is None or not start_dt or not end_dt:
+        return dict(summary_time_series_chart=text_fig("No data available!", size=24))
+
+    start_dt = to_naive_timestamp(start_dt)
+    end_dt = to_naive_timestamp(end_dt)
+    x_range = zoomed_x_range(relayout_data, start_dt, end_dt) if zoomed else None
+    return memoized_figures(
+        ("summary_time_series", dataset.id, start_dt, end_dt, x_range),
+        lambda: _build_chart(dataset, start_dt, end_dt, x_range),
+    )
+
+
 import_me = True
@@ -3,36 +3,34 @@ Callbacks for handling file uploads and view switching between upload and dashbo
 """
 
 import base64
-from io import StringIO
 
 from dash import callback, Input, Output, State, no_update, ctx, html, Patch
 from dash.exceptions import PreventUpdate
 import pandas as pd
 
-from .data_loader import EnergyDataLoader
+from .datasets import get_dataset
+from .parquet_cache import append_digest, content_digest
+from .upload_jobs import UPLOAD_STAGES, upload_jobs
 from .build_table import empty_table, build_table_from_df
 
 
-def df_to_json(df: pd.DataFrame) -> str | None:
-    """Convert DataFrame to JSON string for storage."""
-    return df.to_json(date_format="iso", orient="split")
-
-
 GENERATOR_TABLE_COLUMNS = [
     "Plant",
     "Total Generation (mWh)",
     "Total Consumption (mWh)",
 ]
-CONSUMER_TABLE_COLUMNS = ["Consumer", "Total Consumption (mWh)"]
+HIDDEN_PROGRESS = {"class_name": "hidden", "value": 0, "label": None}
 
+# Polls of upload-job-poll before an upload running in another server
+# process is given up on: 10 minutes at the 500 ms poll interval.
+UPLOAD_POLL_LIMIT = 1200
 
-def _json_to_df(json_str: str | None) -> pd.DataFrame | None:
-    if not json_str:
-        return None
-    try:
-        return pd.read_json(StringIO(json_str), orient="split")
-    except ValueError:
-        return None
+CONSUMER_TABLE_COLUMNS = [
+    "Consumer",
+    "Total Consumption (mWh)",
+    "Expected Consumption (mWh)",
+    "Imbalance (mWh)",
+]
 
 
 def build_generation_summary_table(generations: pd.DataFrame | None):
@@ -50,7 +48,7 @@ def build_generation_summary_table(generations: pd.DataFrame | None):
         )
 
     summary_df = (
-        generations.groupby("Plant")[available_cols]
+        generations.groupby("Plant", observed=True)[available_cols]
         .sum()
         .reset_index()
         .rename(
@@ -65,27 +63,15 @@ def build_generation_summary_table(generations: pd.DataFrame | None):
     return build_table_from_df(summary_df, "Generation Summary")
 
 
-def build_consumption_summary_table(consumptions: pd.DataFrame | None):
-    if consumptions is None or consumptions.empty:
+def build_consumption_summary_table(settlement_summary: pd.DataFrame | None):
+    if settlement_summary is None or settlement_summary.empty:
         return empty_table(
             columns=CONSUMER_TABLE_COLUMNS, caption="Consumption Summary"
         )
 
-    if "Consumption" not in consumptions.columns:
-        consumptions = consumptions.rename(columns={"Value": "Consumption"})
-
-    if "Consumption" not in consumptions.columns:
-        return empty_table(
-            columns=CONSUMER_TABLE_COLUMNS, caption="Consumption Summary"
-        )
-
-    summary_df = (
-        consumptions.groupby("Consumer")["Consumption"]
-        .sum()
-        .reset_index()
-        .rename(columns={"Consumption": "Total Consumption (mWh)"})
-        .sort_values(by="Total Consumption (mWh)", ascending=False)
-    )
+    summary_df = settlement_summary.rename(
+        columns={"Actual Consumption (mWh)": "Total Consumption (mWh)"}
+    ).sort_values(by="Total Consumption (mWh)", ascending=False)
 
     return build_table_from_df(summary_df, "Consumption Summary")
 
@@ -95,14 +81,13 @@ def build_consumption_summary_table(consumptions: pd.DataFrame | None):
         data_name=Output("data-name", "children"),
         upload_section_class=Output("upload-section", "className"),
         dashboard_content_class=Output("dashboard-content", "className"),
-        uploaded_data=dict(
-            generations_data=Output("generations-store", "data"),
-            consumptions_data=Output("consumptions-store", "data"),
-            plant_consumer_data=Output("plant-consumer-store", "data"),
-        ),
+        dataset_id=Output("dataset-store", "data"),
         reload_button_disabled=Output("reload-button", "disabled"),
+        append_disabled=Output("append-data", "disabled"),
         upload_status=Output("upload-status", "children"),
+        append_status=Output("append-status", "children"),
         uploaded_data_contents=Output("upload-data", "contents"),
+        appended_data_contents=Output("append-data", "contents"),
         global_state_out=Output("global-state-store", "data"),
         wholesale_suppliers_options=Output("wholesale-suppliers-select", "options"),
         generation_summary_table=Output("generation-summary-table", "children"),
@@ -124,31 +109,27 @@ def build_consumption_summary_table(consumptions: pd.DataFrame | None):
     inputs=dict(
         pathname=Input("pathname", "href"),
         reload_button=Input("reload-button", "n_clicks"),
-        uploaded_data=dict(
-            generations_data=State("generations-store", "data"),
-            consumptions_data=State("consumptions-store", "data"),
-            plant_consumer_data=State("plant-consumer-store", "data"),
-        ),
+        dataset_id=State("dataset-store", "data"),
         global_state_in=State("global-state-store", "data"),
     ),
 )
-def show_upload_or_dashboard(pathname, reload_button, uploaded_data, global_state_in):
+def show_upload_or_dashboard(pathname, reload_button, dataset_id, global_state_in):
     """
     Control visibility of upload section vs dashboard based on data availability.
     """
+    dataset = get_dataset(dataset_id)
     global_state_in["data-name"] = global_state_in["data-name"] or "No data loaded"
 
     output = {
         "upload_section_class": "",
         "dashboard_content_class": "",
-        "uploaded_data": {
-            "generations_data": no_update,
-            "consumptions_data": no_update,
-            "plant_consumer_data": no_update,
-        },
+        "dataset_id": no_update,
         "reload_button_disabled": True,
+        "append_disabled": True,
         "upload_status": no_update,
+        "append_status": no_update,
         "uploaded_data_contents": None,
+        "appended_data_contents": None,
         "global_state_out": global_state_in,
         "wholesale_suppliers_options": global_state_in["wholesale_suppliers"],
         "generation_summary_table": empty_table(
@@ -172,38 +153,31 @@ def show_upload_or_dashboard(pathname, reload_button, uploaded_data, global_stat
     # Handle reload button click - clear all data and return to upload view
     if ctx.triggered_id == "reload-button":
         output["dashboard_content_class"] = "hidden"
-        output["uploaded_data"]["generations_data"] = None
-        output["uploaded_data"]["consumptions_data"] = None
-        output["uploaded_data"]["plant_consumer_data"] = None
+        output["dataset_id"] = None
         output["upload_status"] = ""
+        output["append_status"] = ""
 
-    # Show upload section if all data is not loaded
-    elif not all(uploaded_data.values()):
+    # Show upload section if no data is loaded or it is no longer cached
+    elif dataset is None:
         output["dashboard_content_class"] = "hidden"
+        if dataset_id:
+            output["dataset_id"] = None
 
     # Show dashboard if data exists
     else:
         output["upload_section_class"] = "hidden"
         output["reload_button_disabled"] = False
-        generations_df = _json_to_df(uploaded_data["generations_data"])
-        consumptions_df = _json_to_df(uploaded_data["consumptions_data"])
+        output["append_disabled"] = False
         output["generation_summary_table"] = build_generation_summary_table(
-            generations_df
+            dataset.monthly_generation
         )
         output["consumption_summary_table"] = build_consumption_summary_table(
-            consumptions_df
+            dataset.settlement_summary
         )
 
-    if uploaded_data["generations_data"] and uploaded_data["consumptions_data"]:
-        generations_df = _json_to_df(uploaded_data["generations_data"])
-        consumptions_df = _json_to_df(uploaded_data["consumptions_data"])
-        consumers = consumptions_df["Consumer"].unique().tolist()  # type: ignore
-        gen_min_datetime = generations_df["Datetime"].min()  # type: ignore
-        gen_max_datetime = generations_df["Datetime"].max()  # type: ignore
-        cons_min_datetime = consumptions_df["Datetime"].min()  # type: ignore
-        cons_max_datetime = consumptions_df["Datetime"].max()  # type: ignore
-        min_datetime = min(gen_min_datetime, cons_min_datetime)
-        max_datetime = max(gen_max_datetime, cons_max_datetime)
+    if dataset is not None and dataset.bounds is not None:
+        consumers = dataset.consumers
+        min_datetime, max_datetime = dataset.bounds
 
         output["analysis_dates"] = {
             "consumption_min": min_datetime,
@@ -218,87 +192,288 @@ def show_upload_or_dashboard(pathname, reload_button, uploaded_data, global_stat
     return output
 
 
+def _submit_upload(upload_job: dict, decoded: bytes, output: dict) -> None:
+    """
+    Start the job for a decoded upload, or mark it done if already loaded.
+
+    `upload_job["digest"]` is set here, derived from the base dataset for
+    an append, and the poll and progress bar of `output` are started.
+    """
+    base = upload_job.get("append_to")
+    upload_job["digest"] = content_digest(decoded)
+    if base is not None:
+        upload_job["digest"] = append_digest(base, upload_job["digest"])
+
+    if get_dataset(upload_job["digest"]) is not None:
+        upload_job["status"] = "done"
+    else:
+        job = upload_jobs.submit(upload_job["digest"], decoded, base)
+        output["poll_disabled"] = False
+        output["progress"] = _progress_output(job.stage)
+
+
+def _progress_output(stage: int, label: str | None = None) -> dict:
+    """Progress bar props for a job at the given UPLOAD_STAGES index."""
+    return {
+        "class_name": "",
+        "value": 100 * stage / len(UPLOAD_STAGES),
+        "label": label
+        or f"Step {stage + 1} of {len(UPLOAD_STAGES)}: {UPLOAD_STAGES[stage]}",
+    }
+
+
 @callback(
     output=dict(
-        pathname=Output("pathname", "href", allow_duplicate=True),
-        generations_store_data=Output(
-            "generations-store", "data", allow_duplicate=True
+        upload_job=Output("upload-job-store", "data", allow_duplicate=True),
+        poll_disabled=Output("upload-job-poll", "disabled", allow_duplicate=True),
+        poll_intervals=Output("upload-job-poll", "n_intervals"),
+        upload_disabled=Output("upload-data", "disabled", allow_duplicate=True),
+        progress=dict(
+            class_name=Output("upload-progress", "className", allow_duplicate=True),
+            value=Output("upload-progress-bar", "value", allow_duplicate=True),
+            label=Output("upload-progress-bar", "label", allow_duplicate=True),
+        ),
+    ),
+    inputs=dict(
+        upload_data_contents=Input("upload-data", "contents"),
+        upload_data_filename=State("upload-data", "filename"),
+    ),
+    prevent_initial_call=True,
+)
+def upload_file(upload_data_contents, upload_data_filename):
+    """
+    Hand an uploaded Excel file to a background job.
+
+    Decodes the upload and starts a job that parses, validates and registers
+    it in the server-side dataset store, then returns at once. The job is
+    followed by poll_upload_job, and finish_upload reports its outcome. A
+    workbook that is already loaded finishes without a job.
+
+    Returns:
+        dict: The job to follow and the initial state of the progress bar
+    """
+    if upload_data_contents is None:
+        raise PreventUpdate
+
+    upload_job = {"digest": None, "filename": upload_data_filename, "status": None}
+    output = {
+        "upload_job": upload_job,
+        "poll_disabled": True,
+        "poll_intervals": 0,
+        "upload_disabled": True,
+        "progress": HIDDEN_PROGRESS,
+    }
+
+    try:
+        content_type, content_string = upload_data_contents.split(",")
+        _submit_upload(upload_job, base64.b64decode(content_string), output)
+    except Exception as e:
+        upload_job.update(status="error", error=str(e))
+
+    return output
+
+
+@callback(
+    output=dict(
+        upload_job=Output("upload-job-store", "data", allow_duplicate=True),
+        poll_disabled=Output("upload-job-poll", "disabled", allow_duplicate=True),
+        poll_intervals=Output("upload-job-poll", "n_intervals", allow_duplicate=True),
+        append_status=Output("append-status", "children", allow_duplicate=True),
+        progress=dict(
+            class_name=Output("upload-progress", "className", allow_duplicate=True),
+            value=Output("upload-progress-bar", "value", allow_duplicate=True),
+            label=Output("upload-progress-bar", "label", allow_duplicate=True),
         ),
-        consumptions_store_data=Output(
-            "consumptions-store", "data", allow_duplicate=True
+    ),
+    inputs=dict(
+        append_data_contents=Input("append-data", "contents"),
+        append_data_filename=State("append-data", "filename"),
+        dataset_id=State("dataset-store", "data"),
+    ),
+    prevent_initial_call=True,
+)
+def append_file(append_data_contents, append_data_filename, dataset_id):
+    """
+    Hand a workbook of new or restated readings to a background job that
+    appends it to the loaded dataset.
+
+    The job registers the result as a new dataset, which finish_upload
+    switches the dashboard to.
+
+    Returns:
+        dict: The job to follow and an in-progress status
+    """
+    if append_data_contents is None or get_dataset(dataset_id) is None:
+        raise PreventUpdate
+
+    upload_job = {
+        "digest": None,
+        "filename": append_data_filename,
+        "append_to": dataset_id,
+        "status": None,
+    }
+    output = {
+        "upload_job": upload_job,
+        "poll_disabled": True,
+        "poll_intervals": 0,
+        "append_status": html.Span(
+            f"Appending {append_data_filename}…", style={"color": "#6c757d"}
         ),
-        plant_consumer_store_data=Output(
-            "plant-consumer-store", "data", allow_duplicate=True
+        "progress": HIDDEN_PROGRESS,
+    }
+
+    try:
+        content_type, content_string = append_data_contents.split(",")
+        _submit_upload(upload_job, base64.b64decode(content_string), output)
+    except Exception as e:
+        upload_job.update(status="error", error=str(e))
+
+    return output
+
+
+@callback(
+    output=dict(
+        upload_job=Output("upload-job-store", "data", allow_duplicate=True),
+        poll_disabled=Output("upload-job-poll", "disabled", allow_duplicate=True),
+        progress=dict(
+            class_name=Output("upload-progress", "className", allow_duplicate=True),
+            value=Output("upload-progress-bar", "value", allow_duplicate=True),
+            label=Output("upload-progress-bar", "label", allow_duplicate=True),
         ),
+    ),
+    inputs=dict(
+        n_intervals=Input("upload-job-poll", "n_intervals"),
+        upload_job=State("upload-job-store", "data"),
+    ),
+    prevent_initial_call=True,
+)
+def poll_upload_job(n_intervals, upload_job):
+    """
+    Report the stage of the running upload job, and its outcome once done.
+    """
+    if not upload_job or upload_job["status"] is not None:
+        raise PreventUpdate
+
+    job = upload_jobs.get(upload_job["digest"])
+    if job is not None and not job.finished:
+        return {
+            "upload_job": no_update,
+            "poll_disabled": False,
+            "progress": _progress_output(job.stage),
+        }
+
+    if job is not None and job.invalid:
+        upload_job["status"] = "invalid"
+    elif job is not None and job.error is not None:
+        upload_job.update(status="error", error=job.error)
+    elif get_dataset(upload_job["digest"]) is not None:
+        upload_job["status"] = "done"
+        if job is not None:
+            upload_job["restated_hours"] = job.restated_hours
+    elif job is not None:
+        # The job finished in this process, so its dataset is not coming.
+        upload_job.update(status="error", error="dataset is no longer available")
+    elif n_intervals < UPLOAD_POLL_LIMIT:
+        # The job runs in another server process; its dataset reaches this
+        # one through the Parquet cache once registered.
+        return {
+            "upload_job": no_update,
+            "poll_disabled": False,
+            "progress": _progress_output(1, label="Processing upload"),
+        }
+    else:
+        upload_job.update(status="error", error="processing did not complete")
+
+    return {
+        "upload_job": upload_job,
+        "poll_disabled": True,
+        "progress": HIDDEN_PROGRESS,
+    }
+
+
+@callback(
+    output=dict(
+        pathname=Output("pathname", "href", allow_duplicate=True),
+        dataset_store_data=Output("dataset-store", "data", allow_duplicate=True),
         upload_status=Output("upload-status", "children", allow_duplicate=True),
+        append_status=Output("append-status", "children", allow_duplicate=True),
         global_state=Output("global-state-store", "data", allow_duplicate=True),
         reload_button_disabled=Output(
             "reload-button", "disabled", allow_duplicate=True
         ),
+        upload_disabled=Output("upload-data", "disabled", allow_duplicate=True),
+        progress_class_name=Output(
+            "upload-progress", "className", allow_duplicate=True
+        ),
     ),
     inputs=dict(
-        upload_data_contents=Input("upload-data", "contents"),
-        upload_data_filename=State("upload-data", "filename"),
+        upload_job=Input("upload-job-store", "data"),
     ),
-    running=[(Output("upload-data", "disabled"), True, False)],
     prevent_initial_call=True,
 )
-def upload_file(upload_data_contents, upload_data_filename):
+def finish_upload(upload_job):
     """
-    Handle file upload, validation, and data processing.
-
-    Processes uploaded Excel file containing energy settlement data,
-    validates it, and stores it in session storage. On success, navigates
-    to the dashboard view.
+    Show the outcome of an upload or append and, on success, navigate to the
+    dashboard of the new dataset.
 
     Returns:
-        dict: Contains processed data, upload status, and navigation state
+        dict: Contains the dataset ID, upload status, and navigation state
     """
-    if upload_data_contents is None:
+    if not upload_job or upload_job["status"] is None:
         raise PreventUpdate
     global_state = Patch()
+    filename = upload_job["filename"]
+    appending = upload_job.get("append_to") is not None
+    status = "append_status" if appending else "upload_status"
 
     output = {
         "pathname": no_update,
-        "generations_store_data": None,
-        "consumptions_store_data": None,
-        "plant_consumer_store_data": None,
+        "dataset_store_data": None,
         "upload_status": no_update,
+        "append_status": no_update,
         "global_state": global_state,
         "reload_button_disabled": True,
+        "upload_disabled": False,
+        "progress_class_name": "hidden",
     }
-
-    try:
-        content_type, content_string = upload_data_contents.split(",")
-        decoded = base64.b64decode(content_string)
-
-        uploaded_data = EnergyDataLoader.load_from_excel(decoded)
-        if not EnergyDataLoader.validate_data(uploaded_data):
-            global_state["data-name"] = "No data loaded"
-            output["upload_status"] = html.Div(
-                "❌ Invalid data format. Please check the Excel file structure.",
-                style={"color": "red"},
-            )
-            return output
-
-        global_state["data-name"] = upload_data_filename
-        global_state["wholesale_suppliers"] = (
-            uploaded_data.generations["Wholesale_Supplier"].unique().tolist()
+    if appending:
+        # A failed append leaves the dashboard on the dataset it started from.
+        output["dataset_store_data"] = no_update
+        output["reload_button_disabled"] = no_update
+
+    dataset = get_dataset(upload_job["digest"])
+    if upload_job["status"] == "done" and dataset is not None:
+        message = f"✓ Successfully loaded: {filename}"
+        if appending:
+            message = f"✓ Appended: {filename}"
+            if upload_job.get("restated_hours"):
+                message += f" ({upload_job['restated_hours']} restated hours)"
+        else:
+            global_state["data-name"] = filename
+        global_state["wholesale_suppliers"] = sorted(
+            dataset.monthly_generation["Wholesale_Supplier"].unique().tolist()
         )
 
         output["pathname"] = "/dashboard"
-        output["generations_store_data"] = df_to_json(uploaded_data.generations)
-        output["consumptions_store_data"] = df_to_json(uploaded_data.consumptions)
-        output["plant_consumer_store_data"] = df_to_json(uploaded_data.plant_consumer)
-        output["upload_status"] = html.Div(
-            f"✓ Successfully loaded: {upload_data_filename}",
+        output["dataset_store_data"] = dataset.id
+        output[status] = html.Div(
+            message,
             style={"color": "green", "font-weight": "bold"},
         )
         output["reload_button_disabled"] = False
-    except Exception as e:
-        global_state["data-name"] = "No data loaded"
-        output["upload_status"] = html.Div(
-            f"❌ Error loading file: {str(e)}",
+    elif upload_job["status"] == "invalid":
+        if not appending:
+            global_state["data-name"] = "No data loaded"
+        output[status] = html.Div(
+            "❌ Invalid data format. Please check the Excel file structure.",
+            style={"color": "red"},
+        )
+    else:
+        if not appending:
+            global_state["data-name"] = "No data loaded"
+        error = upload_job.get("error", "dataset is no longer available")
+        output[status] = html.Div(
+            f"❌ Error loading file: {error}",
             style={"color": "red"},
         )
 
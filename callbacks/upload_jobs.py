@@ -0,0 +1,155 @@
+"""
+Background processing of uploaded workbooks.
+
+Parsing a large workbook takes tens of seconds, which would otherwise pin a
+web worker inside the upload callback. The upload callback, or the
+streaming upload route, instead hands the workbook to a small thread pool
+and returns at once, and a dcc.Interval polls the job's stage until the
+dataset is registered. Jobs are keyed by the content digest of the
+workbook, so uploading a workbook that is already being processed joins
+the running job. A job may also append a delta workbook to a loaded
+dataset instead of loading a workbook from scratch.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from .data_loader import EnergyDataLoader, UploadedData, use_parallel_ingest
+from .datasets import append_dataset, get_dataset, register_dataset
+
+
+UPLOAD_STAGES = (
+    "Receiving upload",
+    "Parsing sheets",
+    "Validating data",
+    "Building indexes",
+)
+
+MAX_UPLOAD_WORKERS = 2
+
+# Seconds a finished job stays queryable by the poll that reports it.
+FINISHED_JOB_TTL = 600
+
+
+@dataclass(slots=True)
+class UploadJob:
+    digest: str
+    base: str | None = None
+    stage: int = 1
+    finished_at: float | None = None
+    invalid: bool = False
+    error: str | None = None
+    restated_hours: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def failed(self) -> bool:
+        return self.invalid or self.error is not None
+
+
+def _discard(source: bytes | Path) -> None:
+    """Delete the temp file of a streamed upload once it is no longer needed."""
+    if isinstance(source, Path):
+        source.unlink(missing_ok=True)
+
+
+def _is_empty(uploaded_data: UploadedData) -> bool:
+    """Whether a delta workbook holds neither readings nor contracts."""
+    return (
+        uploaded_data.generations.empty
+        and uploaded_data.consumptions.empty
+        and uploaded_data.plant_consumer.empty
+    )
+
+
+class UploadJobs:
+    """Per-process registry of upload jobs running on a thread pool."""
+
+    def __init__(self, max_workers: int):
+        self._jobs: dict[str, UploadJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="upload")
+
+    def submit(
+        self, digest: str, source: bytes | Path, base: str | None = None
+    ) -> UploadJob:
+        """
+        Start processing a workbook, unless it is already running.
+
+        Args:
+            digest: Content digest of the workbook, or for an append the
+                `append_digest` of the base dataset and the workbook
+            source: Decoded workbook bytes, or the temp file of a streamed
+                upload, which is deleted once the job no longer needs it
+            base: ID of the dataset to append the workbook to, if any
+
+        Returns:
+            Snapshot of the job processing the workbook
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(digest)
+            if job is not None and not job.failed:
+                _discard(source)
+                return replace(job)
+            job = self._jobs[digest] = UploadJob(digest, base)
+
+        self._executor.submit(self._run, job, source)
+        return replace(job)
+
+    def get(self, digest: str) -> UploadJob | None:
+        """Return a snapshot of the job for a digest, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(digest)
+            return None if job is None else replace(job)
+
+    def _prune(self) -> None:
+        expired = time.monotonic() - FINISHED_JOB_TTL
+        for digest, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < expired:
+                del self._jobs[digest]
+
+    def _set(self, job: UploadJob, **changes) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+
+    def _run(self, job: UploadJob, source: bytes | Path) -> None:
+        try:
+            if get_dataset(job.digest) is None:
+                base = None
+                if job.base is not None:
+                    base = get_dataset(job.base)
+                    if base is None:
+                        raise ValueError("the dataset to append to is not loaded")
+                uploaded_data = EnergyDataLoader.load_from_excel(
+                    source,
+                    parallel=use_parallel_ingest(source),
+                    delta=base is not None,
+                )
+                self._set(job, stage=2)
+                if not EnergyDataLoader.validate_data(uploaded_data) or (
+                    base is not None and _is_empty(uploaded_data)
+                ):
+                    self._set(job, invalid=True)
+                    return
+                self._set(job, stage=3)
+                if base is None:
+                    register_dataset(job.digest, uploaded_data)
+                else:
+                    _, restated_hours = append_dataset(base, job.digest, uploaded_data)
+                    self._set(job, restated_hours=restated_hours)
+        except Exception as e:
+            self._set(job, error=str(e))
+        finally:
+            _discard(source)
+            self._set(job, finished_at=time.monotonic())
+
+
+upload_jobs = UploadJobs(MAX_UPLOAD_WORKERS)
@@ -0,0 +1,113 @@
+"""
+Streaming upload route for workbooks.
+
+dcc.Upload base64-encodes a workbook in the browser and sends it back as
+the `contents` prop, so the server holds the encoded string and the decoded
+bytes at once. The POST route registered here instead receives the raw
+file, either as the request body or as the `file` field of a multipart
+form, and streams it to a temp file in fixed-size chunks while hashing it.
+The background upload job then opens that file by path. With an
+`append_to` query argument naming a loaded dataset, the workbook is
+appended to that dataset as a delta instead.
+
+assets/upload.js sends files dropped on or selected in `upload-data` to
+this route, and those of `append-data` with `append_to` set to the loaded
+dataset.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from flask import jsonify, request
+
+from .datasets import get_dataset
+from .parquet_cache import CACHE_DIR, append_digest
+from .upload_jobs import upload_jobs
+
+
+UPLOAD_ROUTE = "/upload"
+UPLOAD_DIR = CACHE_DIR.parent / "uploads"
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = 1024**3
+
+
+def _stream_to_file(stream, directory: Path) -> tuple[Path, str]:
+    """
+    Copy a binary stream into a new temp file, hashing it on the way.
+
+    Returns:
+        Path of the temp file and the SHA-256 hex digest of its content
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, name = tempfile.mkstemp(suffix=".xlsx", dir=directory)
+    path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            while chunk := stream.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise ValueError("upload exceeds the size limit")
+                digest.update(chunk)
+                file.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path, digest.hexdigest()
+
+
+def receive_upload():
+    """
+    Receive a workbook and start processing it.
+
+    Returns:
+        JSON in the shape of `upload-job-store` data: the digest, filename,
+        the dataset appended to and status, which is "done" for an already
+        loaded workbook and null while its job runs
+    """
+    if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+        return jsonify(error="upload exceeds the size limit"), 413
+    append_to = request.args.get("append_to") or None
+    if append_to is not None and get_dataset(append_to) is None:
+        return jsonify(error="the dataset to append to is not loaded"), 404
+
+    # Only multipart bodies go through the form parser; any other body is
+    # read from the raw stream, whatever its declared content type.
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("file")
+        if upload is None:
+            return jsonify(error="no file in the upload"), 400
+        stream, filename = upload.stream, upload.filename
+    else:
+        stream, filename = request.stream, request.args.get("filename", "")
+
+    try:
+        path, digest = _stream_to_file(stream, UPLOAD_DIR)
+    except ValueError as e:
+        return jsonify(error=str(e)), 413
+    if path.stat().st_size == 0:
+        path.unlink()
+        return jsonify(error="the upload is empty"), 400
+
+    if append_to is not None:
+        digest = append_digest(append_to, digest)
+    upload_job = {
+        "digest": digest,
+        "filename": filename,
+        "append_to": append_to,
+        "status": None,
+    }
+    if get_dataset(digest) is not None:
+        path.unlink(missing_ok=True)
+        upload_job["status"] = "done"
+    else:
+        upload_jobs.submit(digest, path, append_to)
+    return jsonify(upload_job)
+
+
+def register_upload_route(server) -> None:
+    """Register the streaming upload route on the Dash app's Flask server."""
+    server.add_url_rule(UPLOAD_ROUTE, "upload", receive_upload, methods=["POST"])
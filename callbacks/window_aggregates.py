@@ -0,0 +1,123 @@
+"""
+Per-window aggregates shared by the metric and chart callbacks.
+
+One edit of `start-datetime` or `end-datetime` fires the metrics, the
+generation mix and supplier charts, the plant profiles and the summary
+time series at once. Each asks `window_aggregates` for the same window,
+which computes every aggregate they need in one pass and keeps the result
+in a per-process LRU keyed by dataset and window. Callbacks arriving while
+the pass runs wait for it instead of repeating it.
+
+Those aggregates come from the dataset's prefix sums and rollup cube, so
+the pass is cheap. The plant profiles need generation by plant and hour,
+which means grouping every reading in the window; `window_plant_hours`
+keeps that in an LRU of its own so the metric cards and the other charts
+never wait on it.
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .datasets import Dataset
+from .lru_cache import CacheInfo, LRUCache
+from .time_index import to_naive_timestamp
+
+
+MAX_WINDOWS_IN_MEMORY = 8
+MAX_WINDOW_BYTES = 256 * 1024**2
+MAX_PLANT_HOURS_IN_MEMORY = 4
+MAX_PLANT_HOURS_BYTES = 256 * 1024**2
+
+
+@dataclass(frozen=True, slots=True)
+class WindowAggregates:
+    total_generation: float
+    total_gen_consumption: float
+    total_consumption: float
+    # Per-hour totals, indexed by Datetime.
+    hourly_generation: pd.DataFrame
+    hourly_consumption: pd.DataFrame
+    gen_mix: pd.Series
+    wholesale_suppliers: pd.Series
+
+
+def _nbytes(aggregates: WindowAggregates) -> int:
+    frames = (aggregates.hourly_generation, aggregates.hourly_consumption)
+    series = (aggregates.gen_mix, aggregates.wholesale_suppliers)
+    return int(
+        sum(frame.memory_usage(deep=True).sum() for frame in frames)
+        + sum(values.memory_usage(deep=True) for values in series)
+    )
+
+
+def _frame_nbytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(deep=True).sum())
+
+
+_windows = LRUCache(MAX_WINDOWS_IN_MEMORY, max_bytes=MAX_WINDOW_BYTES, sizeof=_nbytes)
+_plant_hours = LRUCache(
+    MAX_PLANT_HOURS_IN_MEMORY, max_bytes=MAX_PLANT_HOURS_BYTES, sizeof=_frame_nbytes
+)
+
+
+def _aggregate(
+    dataset: Dataset, start: pd.Timestamp, end: pd.Timestamp
+) -> WindowAggregates:
+    generation_totals = dataset.generation_totals
+    consumption_totals = dataset.consumption_totals
+    cells = dataset.generation_rollup.window_cells(start, end)
+    return WindowAggregates(
+        total_generation=generation_totals.sum("Generation", start, end),
+        total_gen_consumption=generation_totals.sum("Gen_Consumption", start, end),
+        total_consumption=consumption_totals.sum("Consumption", start, end),
+        hourly_generation=generation_totals.window(start, end),
+        hourly_consumption=consumption_totals.window(start, end),
+        gen_mix=cells.groupby("Gen_Mix", observed=True)["Generation"].sum(),
+        wholesale_suppliers=cells.groupby("Wholesale_Supplier", observed=True)[
+            "Generation"
+        ].sum(),
+    )
+
+
+def window_aggregates(dataset: Dataset, start, end) -> WindowAggregates:
+    """
+    Aggregates of a dataset over start <= Datetime <= end, computed once.
+
+    Args:
+        dataset: Loaded dataset
+        start: Start picker value
+        end: End picker value
+    """
+    start, end = to_naive_timestamp(start), to_naive_timestamp(end)
+    return _windows.get_or_load(
+        (dataset.id, start, end), lambda: _aggregate(dataset, start, end)
+    )
+
+
+def window_plant_hours(dataset: Dataset, start, end) -> pd.DataFrame:
+    """
+    Generation by Plant, Wholesale_Supplier and Datetime over a window.
+
+    Args:
+        dataset: Loaded dataset
+        start: Start picker value
+        end: End picker value
+    """
+    start, end = to_naive_timestamp(start), to_naive_timestamp(end)
+    return _plant_hours.get_or_load(
+        (dataset.id, start, end),
+        lambda: (
+            dataset.generations.window(start, end)
+            .groupby(["Plant", "Wholesale_Supplier", "Datetime"], observed=True)[
+                "Generation"
+            ]
+            .sum()
+            .reset_index()
+        ),
+    )
+
+
+def window_cache_info() -> CacheInfo:
+    """Return hit and miss counters of the in-memory window aggregate cache."""
+    return _windows.info()
@@ -0,0 +1,115 @@
+"""
+Time bucket_hourly against the groupby().resample("h").sum() it replaced,
+on synthetic consumption readings: one reading per meter and hour at a
+random minute, with 2% of readings missing so resample has gaps to fill.
+
+    python -m scripts.bench_bucketing
+    python -m scripts.bench_bucketing --meters 100 --days 30
+
+The defaults, 1,000 meters over 365 days, give about 8.58M readings, more
+than an Excel sheet can hold, so the frame is built in memory. Each method
+runs in its own process, so its peak RSS is its own; the script then fails
+unless both produced exactly the same frame.
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from callbacks.data_loader import bucket_hourly
+
+
+METHODS = {
+    "resample": lambda readings: (
+        readings.set_index("Datetime")
+        .groupby("Consumer")
+        .resample("h", include_groups=False)
+        .sum()
+        .reset_index()
+    ),
+    "bucket_hourly": lambda readings: bucket_hourly(
+        readings, ["Consumer"], ["Consumption"]
+    ),
+}
+
+
+def make_readings(meters: int, days: int, seed: int = 1) -> pd.DataFrame:
+    """Hourly consumption readings of `meters` meters over `days` days."""
+    rng = np.random.default_rng(seed)
+    hours = 24 * days
+    times = np.tile(
+        pd.date_range("2024-01-01", periods=hours, freq="h").to_numpy(), meters
+    ) + rng.integers(0, 3600, meters * hours).astype("timedelta64[s]")
+    consumers = np.repeat(
+        np.array([f"Customer {i}" for i in range(meters)], dtype=object), hours
+    )
+    kept = rng.random(meters * hours) > 0.02
+    return pd.DataFrame(
+        {
+            "Datetime": times[kept],
+            "Consumer": consumers[kept],
+            "Consumption": rng.random(kept.sum()) * 1e6,
+        }
+    )
+
+
+def run_method(method: str, meters: int, days: int, output: str) -> None:
+    """Bucket the readings with one method and pickle its frame to `output`."""
+    readings = make_readings(meters, days)
+    start = time.perf_counter()
+    hourly = METHODS[method](readings)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024**2
+    print(
+        f"  {method:14} {elapsed:6.2f} s   peak RSS {peak_rss:5.2f} GB   "
+        f"{len(readings):,} readings"
+    )
+    hourly.to_pickle(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--meters", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--method", choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method is not None:
+        run_method(args.method, args.meters, args.days, args.output)
+        return
+
+    frames = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for method in METHODS:
+            output = os.path.join(directory, f"{method}.pkl")
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "scripts.bench_bucketing",
+                    f"--meters={args.meters}",
+                    f"--days={args.days}",
+                    f"--method={method}",
+                    f"--output={output}",
+                ],
+                check=True,
+            )
+            frames[method] = pd.read_pickle(output)
+
+    expected, hourly = frames.values()
+    pd.testing.assert_frame_equal(hourly, expected, check_exact=True)
+    zero_filled = int((hourly["Consumption"] == 0).sum())
+    print(f"{len(hourly):,} hourly rows, {zero_filled:,} zero-filled, identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare the encodings a loaded frame can cross a process or client
+boundary in: the split-orient ISO JSON the dataset stores used to hold, the
+Parquet bytes of callbacks/codec.py, raw and base64-encoded, and the pickle
+that results of the ingest worker processes travel in.
+
+    python -m scripts.make_workbook /tmp/settlement.xlsx
+    python -m scripts.bench_codec /tmp/settlement.xlsx
+
+Each Parquet round trip must give back the original frame, or the script
+fails.
+"""
+
+import argparse
+import base64
+import pickle
+import time
+from io import StringIO
+
+import pandas as pd
+
+from callbacks.codec import frame_from_bytes, frame_to_bytes
+from callbacks.data_loader import EnergyDataLoader
+
+
+ENCODINGS = {
+    "JSON (split, iso)": (
+        lambda frame: frame.to_json(date_format="iso", orient="split"),
+        lambda payload: pd.read_json(StringIO(payload), orient="split"),
+    ),
+    "Parquet": (frame_to_bytes, frame_from_bytes),
+    "Parquet + base64": (
+        lambda frame: base64.b64encode(frame_to_bytes(frame)).decode("ascii"),
+        lambda payload: frame_from_bytes(base64.b64decode(payload)),
+    ),
+    "pickle": (pickle.dumps, pickle.loads),
+}
+
+
+def _best_of(repeat: int, function, *args):
+    """Smallest wall time of `repeat` calls, and the result of the last one."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        runs.append(time.perf_counter() - start)
+    return min(runs), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("workbook", help="workbook to load, see make_workbook")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each step")
+    args = parser.parse_args()
+
+    uploaded_data = EnergyDataLoader.load_from_excel(args.workbook)
+    print("times are encode / decode")
+    for name in ("generations", "consumptions"):
+        frame = getattr(uploaded_data, name)
+        print(f"{name}, {len(frame):,} rows")
+        for label, (encode, decode) in ENCODINGS.items():
+            encode_time, payload = _best_of(args.repeat, encode, frame)
+            decode_time, decoded = _best_of(args.repeat, decode, payload)
+            if label.startswith("Parquet"):
+                pd.testing.assert_frame_equal(decoded, frame)
+            print(
+                f"  {label:20} {len(payload) / 1e6:5.2f} MB  "
+                f"{encode_time * 1e3:6.1f} ms / {decode_time * 1e3:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
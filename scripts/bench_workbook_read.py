@@ -0,0 +1,133 @@
+"""
+Time load_from_excel against the loader it replaced, which called
+pd.read_excel once per sheet and so unzipped the workbook and parsed every
+sheet's XML five times.
+
+    python -m scripts.make_workbook /tmp/settlement.xlsx
+    python -m scripts.bench_workbook_read /tmp/settlement.xlsx
+
+Both loaders must give the same frames, up to the categorical dtypes of
+the identifier columns, or the script fails.
+"""
+
+import argparse
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from callbacks.data_loader import SHEET_COLUMNS, EnergyDataLoader
+
+
+def _read_excel_loader(file_content: bytes) -> dict[str, pd.DataFrame]:
+    """The five read_excel calls of the previous load_from_excel."""
+    excel_file = BytesIO(file_content)
+    sheets = {}
+    for sheet_name, columns in SHEET_COLUMNS.items():
+        excel_file.seek(0)
+        sheets[sheet_name] = pd.read_excel(
+            excel_file, sheet_name=sheet_name, usecols=columns
+        )
+
+    generations = sheets["Generation"].dropna().copy()
+    generations["Datetime"] = pd.to_datetime(
+        generations["Date"].astype(str) + " " + generations["Time"].astype(str)
+    )
+    register = sheets["Generation_Register"].set_index("GMeter")
+    generations["Plant"] = generations["GMeter"].map(register["Generator_Name"])
+    generations["Wholesale_Supplier"] = generations["GMeter"].map(
+        register["Wholesale_Supplier"]
+    )
+    generations["Gen_Mix"] = generations["GMeter"].map(register["Gen_Mix"])
+    generations = (
+        generations.drop(columns=["Date", "Time", "GMeter"])
+        .set_index("Datetime")
+        .groupby(["Plant", "Wholesale_Supplier", "Gen_Mix"])
+        .resample("h", include_groups=False)[["Generation", "Gen_Consumption"]]
+        .sum()
+        .reset_index()
+    )
+
+    consumptions = sheets["Load_Consumption"].dropna().copy()
+    consumptions["Datetime"] = pd.to_datetime(
+        consumptions["Day"].astype(str) + " " + consumptions["Time"].astype(str)
+    )
+    register = sheets["Load_Register"].set_index("CMeter")
+    consumptions["Consumer"] = consumptions["CMeter"].map(register["Customer"])
+    consumptions = (
+        consumptions.drop(columns=["Day", "Time", "CMeter"])
+        .set_index("Datetime")
+        .groupby("Consumer")
+        .resample("h", include_groups=False)
+        .sum()
+        .reset_index()
+    )
+
+    plant_consumer = sheets["Contract_Register"].rename(
+        columns={
+            "Wholesale_Supplier": "Plant",
+            "Load": "Consumer",
+            "EnergyShared%": "Pct",
+        }
+    )
+
+    generations[["Generation", "Gen_Consumption"]] /= 1_000_000
+    consumptions["Consumption"] /= 1_000_000
+    return dict(
+        generations=generations,
+        consumptions=consumptions,
+        plant_consumer=plant_consumer,
+    )
+
+
+LOADERS = {
+    "five read_excel calls": _read_excel_loader,
+    "single read-only pass": EnergyDataLoader.load_from_excel,
+}
+
+
+def _assert_same_frames(old: pd.DataFrame, new: pd.DataFrame) -> None:
+    new = new.astype(
+        {
+            col: object
+            for col in new.columns
+            if isinstance(new[col].dtype, pd.CategoricalDtype)
+        }
+    )
+    pd.testing.assert_frame_equal(
+        old.reset_index(drop=True), new[old.columns].reset_index(drop=True)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("workbook", help="workbook to load, see make_workbook")
+    parser.add_argument("--repeat", type=int, default=1, help="runs of each loader")
+    args = parser.parse_args()
+
+    with open(args.workbook, "rb") as file:
+        file_content = file.read()
+    print(f"{args.workbook}: {len(file_content) / 1e6:.1f} MB")
+
+    results = {}
+    for label, load in LOADERS.items():
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            frames = load(file_content)
+            runs.append(time.perf_counter() - start)
+        results[label] = min(runs), frames
+
+    (_, old), (_, new) = results.values()
+    for name in ("generations", "consumptions", "plant_consumer"):
+        _assert_same_frames(old[name], getattr(new, name))
+    print(
+        f"{len(new.generations):,} hourly generation and "
+        f"{len(new.consumptions):,} hourly consumption rows, identical frames"
+    )
+    for label, (seconds, _) in results.items():
+        print(f"  {label:24} {seconds:6.1f} s")
+
+
+if __name__ == "__main__":
+    main()
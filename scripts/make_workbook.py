@@ -0,0 +1,141 @@
+"""
+Write a synthetic settlement workbook for the benchmark scripts.
+
+The workbook has the five sheets load_from_excel reads, plus one unused
+column per sheet, with meter readings at a fixed step. The defaults give
+the 14-day workbook the benchmarks were run on: 40 GMeters and 200 CMeters
+every 15 minutes, about 54k Generation and 269k Load_Consumption rows and
+11 MB on disk.
+
+    python -m scripts.make_workbook /tmp/settlement.xlsx
+"""
+
+import argparse
+import datetime as dt
+import random
+
+from openpyxl import Workbook
+
+
+GEN_MIXES = ["Hydro", "Thermal", "Solar", "Wind"]
+
+
+def make_workbook(
+    path: str,
+    plants: int = 40,
+    consumers: int = 200,
+    days: int = 14,
+    step_minutes: int = 15,
+    start: dt.date = dt.date(2024, 1, 1),
+    seed: int = 1,
+) -> None:
+    """
+    Write a synthetic workbook.
+
+    Plant 3 has no readings for the first half of the second day, so the
+    hourly frames have a gap to fill.
+
+    Args:
+        path: File to write
+        plants: Number of GMeters, one plant each
+        consumers: Number of CMeters, one customer each
+        days: Number of days of readings
+        step_minutes: Minutes between two readings of a meter
+        start: First day of readings
+        seed: Seed of the random readings and contracts
+    """
+    rng = random.Random(seed)
+    suppliers = [f"SUP{i}" for i in range(max(2, plants // 4))]
+    steps = 24 * 60 // step_minutes
+    readings = [
+        (
+            dt.datetime.combine(start + dt.timedelta(days=day), dt.time()),
+            (dt.datetime.min + dt.timedelta(minutes=step * step_minutes)).time(),
+            day,
+            step,
+        )
+        for day in range(days)
+        for step in range(steps)
+    ]
+
+    workbook = Workbook(write_only=True)
+
+    sheet = workbook.create_sheet("Generation")
+    sheet.append(["Date", "Time", "Generation", "Gen_Consumption", "GMeter", "Extra"])
+    for date, time, day, step in readings:
+        for plant in range(plants):
+            if plant == 3 and day == 1 and step < steps // 2:
+                continue
+            sheet.append(
+                [
+                    date,
+                    time,
+                    rng.random() * 5e6,
+                    rng.random() * 1e5,
+                    f"GM{plant}",
+                    "x",
+                ]
+            )
+
+    sheet = workbook.create_sheet("Generation_Register")
+    sheet.append(["GMeter", "Generator_Name", "Wholesale_Supplier", "Gen_Mix", "Other"])
+    for plant in range(plants):
+        sheet.append(
+            [
+                f"GM{plant}",
+                f"Plant {plant}",
+                suppliers[plant % len(suppliers)],
+                GEN_MIXES[plant % len(GEN_MIXES)],
+                1,
+            ]
+        )
+
+    sheet = workbook.create_sheet("Load_Consumption")
+    sheet.append(["Day", "Time", "Consumption", "CMeter", "Extra"])
+    for date, time, _, _ in readings:
+        for consumer in range(consumers):
+            sheet.append([date, time, rng.random() * 1e6, f"CM{consumer}", "y"])
+
+    sheet = workbook.create_sheet("Load_Register")
+    sheet.append(["CMeter", "Customer", "Region"])
+    for consumer in range(consumers):
+        sheet.append([f"CM{consumer}", f"Customer {consumer}", "R"])
+
+    # The register names plants in its Wholesale_Supplier column.
+    sheet = workbook.create_sheet("Contract_Register")
+    sheet.append(["Wholesale_Supplier", "Load", "EnergyShared%", "Note"])
+    for consumer in range(consumers):
+        for plant in rng.sample(range(plants), min(3, plants)):
+            sheet.append(
+                [
+                    f"Plant {plant}",
+                    f"Customer {consumer}",
+                    round(rng.random() * 0.3, 3),
+                    "",
+                ]
+            )
+
+    workbook.save(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("path", help="workbook to write")
+    parser.add_argument("--plants", type=int, default=40)
+    parser.add_argument("--consumers", type=int, default=200)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--step-minutes", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    make_workbook(
+        args.path,
+        plants=args.plants,
+        consumers=args.consumers,
+        days=args.days,
+        step_minutes=args.step_minutes,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
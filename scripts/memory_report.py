@@ -0,0 +1,79 @@
+"""
+Report the memory of the loaded frames for each dtype layout of their
+identifier and reading columns, and the peak traced while building a full
+Dataset, settlement included, from them.
+
+    python -m scripts.make_workbook /tmp/settlement.xlsx
+    python -m scripts.memory_report /tmp/settlement.xlsx
+
+Frame sizes are memory_usage(deep=True); the Dataset peak is measured with
+tracemalloc and so counts Python allocations only.
+"""
+
+import argparse
+import tempfile
+import tracemalloc
+from dataclasses import fields
+
+import pandas as pd
+
+from callbacks.data_loader import EnergyDataLoader, UploadedData
+from callbacks.datasets import Dataset, normalize_dtypes
+from callbacks.parquet_cache import ParquetCache, content_digest
+
+
+def _megabytes(frame: pd.DataFrame) -> float:
+    return frame.memory_usage(deep=True).sum() / 1e6
+
+
+def _as_objects(uploaded_data: UploadedData) -> UploadedData:
+    """The frames with categorical identifiers cast back to strings."""
+    frames = []
+    for field in fields(UploadedData):
+        frame = getattr(uploaded_data, field.name)
+        categoricals = frame.select_dtypes("category").columns
+        frames.append(frame.astype({col: object for col in categoricals}))
+    return UploadedData(*frames)
+
+
+def _dataset_peak(label: str, uploaded_data: UploadedData, directory: str) -> float:
+    """Peak traced megabytes of caching the frames and building their Dataset."""
+    digest = content_digest(label.encode())
+    cache = ParquetCache(directory, max_bytes=2 * 1024**3)
+    tracemalloc.start()
+    try:
+        cache.put(digest, normalize_dtypes(uploaded_data))
+        Dataset(digest, cache.get(digest))
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("workbook", help="workbook to load, see make_workbook")
+    args = parser.parse_args()
+
+    float64 = EnergyDataLoader.load_from_excel(args.workbook)
+    float32 = EnergyDataLoader.load_from_excel(args.workbook, float32=True)
+    layouts = {
+        "object / float64": _as_objects(float64),
+        "category / float64": float64,
+        "category / float32": float32,
+    }
+
+    print(f"{'':20} {'generations':>12} {'consumptions':>13}")
+    for label, uploaded_data in layouts.items():
+        print(
+            f"{label:20} {_megabytes(uploaded_data.generations):9.2f} MB "
+            f"{_megabytes(uploaded_data.consumptions):10.2f} MB"
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label in ("category / float64", "category / float32"):
+            peak = _dataset_peak(label, layouts[label], directory)
+            print(f"Dataset peak, {label}: {peak:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
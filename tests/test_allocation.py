@@ -0,0 +1,143 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from callbacks.allocation import (
+    AllocationMatrix,
+    consumer_hourly_allocation,
+    plant_generation_matrix,
+)
+
+
+def _iterrows_allocation(day_generations, consumer_plants):
+    """The per-row loop update_dashboard used before the allocation matrix."""
+    hourly_data = []
+    for hour in range(24):
+        row_data = {"Hour": hour}
+        total_consumption = 0
+        total_generation = 0
+        for _, plant_row in consumer_plants.iterrows():
+            plant = plant_row["Plant"]
+            pct = plant_row["Pct"]
+            plant_generations = day_generations[
+                (day_generations["Plant"] == plant)
+                & (day_generations["Datetime"].dt.hour == hour)
+            ]
+            if len(plant_generations) > 0:
+                generation_value = plant_generations.iloc[0]["Generation"]
+                total_consumption += generation_value * pct
+                total_generation += generation_value
+                row_data[f"{plant} Generation (mWh)"] = round(generation_value, 2)
+            else:
+                row_data[f"{plant} Generation (mWh)"] = 0
+        row_data["Expected Consumption (mWh)"] = round(total_consumption, 2)
+        row_data["Total Plants Generation (mWh)"] = round(total_generation, 2)
+        hourly_data.append(row_data)
+    return pd.DataFrame(hourly_data)
+
+
+def _day_generations() -> pd.DataFrame:
+    hours = pd.date_range("2024-01-01", periods=24, freq="h")
+    rng = np.random.default_rng(8)
+    frames = []
+    for plant in ["PLANT_A", "PLANT_B", "PLANT_C"]:
+        generation = rng.uniform(1, 50, size=24).round(3)
+        frames.append(
+            pd.DataFrame({"Datetime": hours, "Plant": plant, "Generation": generation})
+        )
+    generations = pd.concat(frames, ignore_index=True)
+    # Contract gap: PLANT_B has no readings from 06:00 to 09:00.
+    gap = (generations["Plant"] == "PLANT_B") & generations["Datetime"].dt.hour.isin(
+        range(6, 10)
+    )
+    generations = generations[~gap]
+    # Zero-generation hour for every plant at 03:00.
+    generations.loc[generations["Datetime"].dt.hour == 3, "Generation"] = 0.0
+    generations["Plant"] = generations["Plant"].astype("category")
+    return generations.reset_index(drop=True)
+
+
+class ConsumerHourlyAllocationTest(unittest.TestCase):
+    def assert_matches_iterrows(self, consumer_plants):
+        day_generations = _day_generations()
+        pd.testing.assert_frame_equal(
+            consumer_hourly_allocation(day_generations, consumer_plants),
+            _iterrows_allocation(day_generations, consumer_plants),
+            check_dtype=False,
+        )
+
+    def test_contract_gap_and_zero_generation_hour(self):
+        consumer_plants = pd.DataFrame(
+            {"Plant": ["PLANT_A", "PLANT_B"], "Pct": [0.25, 0.6]}
+        )
+        self.assert_matches_iterrows(consumer_plants)
+
+    def test_plant_without_generation(self):
+        consumer_plants = pd.DataFrame(
+            {"Plant": ["PLANT_C", "PLANT_UNKNOWN"], "Pct": [0.5, 0.4]}
+        )
+        self.assert_matches_iterrows(consumer_plants)
+
+    def test_plant_contracted_twice(self):
+        consumer_plants = pd.DataFrame(
+            {"Plant": ["PLANT_B", "PLANT_A", "PLANT_B"], "Pct": [0.1, 0.3, 0.2]}
+        )
+        self.assert_matches_iterrows(consumer_plants)
+
+
+def _contracts() -> pd.DataFrame:
+    # PLANT_UNKNOWN has no readings; PLANT_A is contracted twice by CONSUMER_1.
+    return pd.DataFrame(
+        {
+            "Plant": ["PLANT_A", "PLANT_B", "PLANT_A", "PLANT_UNKNOWN", "PLANT_C"],
+            "Consumer": [
+                "CONSUMER_1",
+                "CONSUMER_1",
+                "CONSUMER_1",
+                "CONSUMER_2",
+                "CONSUMER_3",
+            ],
+            "Pct": [0.25, 0.6, 0.1, 0.5, 0.3],
+        }
+    )
+
+
+def _pct_matrix(allocation: AllocationMatrix) -> np.ndarray:
+    """Dense Plant × Consumer matrix of summed contract shares."""
+    return (
+        _contracts()
+        .pivot_table(index="Plant", columns="Consumer", values="Pct", aggfunc="sum")
+        .reindex(index=allocation.plants, columns=allocation.consumers)
+        .fillna(0)
+        .to_numpy()
+    )
+
+
+class AllocationMatrixTest(unittest.TestCase):
+    def test_apply_matches_dense_product(self):
+        allocation = AllocationMatrix(_contracts())
+        generation = plant_generation_matrix(_day_generations(), allocation.plants)
+        self.assertTrue((generation["PLANT_UNKNOWN"] == 0).all())
+
+        # Small chunks exercise the chunk boundaries.
+        np.testing.assert_allclose(
+            allocation.apply(generation.to_numpy(), chunk_rows=5),
+            generation.to_numpy() @ _pct_matrix(allocation),
+        )
+
+    def test_expected_consumption_matches_dense_product(self):
+        allocation = AllocationMatrix(_contracts())
+        day_generations = _day_generations()
+        generation = plant_generation_matrix(day_generations, allocation.plants)
+
+        expected = allocation.expected_consumption(day_generations)
+        self.assertTrue(expected.index.equals(generation.index))
+        self.assertEqual(list(expected.columns), list(allocation.consumers))
+        np.testing.assert_allclose(
+            expected.to_numpy(), generation.to_numpy() @ _pct_matrix(allocation)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import datetime as dt
+import unittest
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from callbacks.data_loader import (
+    SHEET_COLUMNS,
+    EnergyDataLoader,
+    bucket_hourly,
+    combine_date_time,
+)
+
+
+def _workbook(*sheets: str) -> bytes:
+    """A workbook with one day of half-hourly readings on the given sheets."""
+    day = dt.datetime(2024, 1, 1)
+    rows = {
+        "Generation": [
+            [day, dt.time(slot // 2, 30 * (slot % 2)), 2e6, 1e5, "GM1"]
+            for slot in range(48)
+        ],
+        "Generation_Register": [["GM1", "PLANT_A", "SUPPLIER_A", "Hydro"]],
+        "Load_Consumption": [
+            [day, dt.time(slot // 2, 30 * (slot % 2)), 1e6, "CM1"] for slot in range(48)
+        ],
+        "Load_Register": [["CM1", "CONSUMER_1"]],
+        "Contract_Register": [["PLANT_A", "CONSUMER_1", 0.5]],
+    }
+    workbook = Workbook(write_only=True)
+    for sheet in sheets:
+        worksheet = workbook.create_sheet(sheet)
+        worksheet.append(SHEET_COLUMNS[sheet])
+        for row in rows[sheet]:
+            worksheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _readings(seed: int) -> pd.DataFrame:
+    """Half-hourly readings of three meters, one missing from the register."""
+    rng = np.random.default_rng(seed)
+    slots = pd.date_range("2024-01-01", periods=2 * 24 * 10, freq="30min")
+    meters = {"CM1": "CONSUMER_1", "CM2": "CONSUMER_2", "CM3": None}
+    readings = pd.DataFrame(
+        {
+            "Datetime": np.tile(slots, len(meters))
+            + rng.integers(0, 30 * 60, len(slots) * len(meters)).astype(
+                "timedelta64[s]"
+            ),
+            "Consumer": np.repeat(list(meters.values()), len(slots)),
+            "Consumption": rng.uniform(0, 100, len(slots) * len(meters)),
+        }
+    )
+    # Gaps of whole hours, and a day without readings for one consumer.
+    kept = rng.random(len(readings)) > 0.2
+    kept &= ~(
+        (readings["Consumer"] == "CONSUMER_2") & (readings["Datetime"].dt.day == 4)
+    )
+    return readings[kept].sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _resampled(readings: pd.DataFrame) -> pd.DataFrame:
+    """Hourly buckets the way the loader used to compute them."""
+    return (
+        readings.set_index("Datetime")
+        .groupby("Consumer")
+        .resample("h", include_groups=False)
+        .sum()
+        .reset_index()
+    )
+
+
+class BucketHourlyTest(unittest.TestCase):
+    def test_matches_resample(self):
+        readings = _readings(1)
+        hourly = bucket_hourly(readings, ["Consumer"], ["Consumption"])
+        expected = _resampled(readings)
+        pd.testing.assert_frame_equal(hourly, expected, check_exact=True)
+        self.assertNotIn(None, hourly["Consumer"].tolist())
+        self.assertEqual(set(hourly["Consumer"]), {"CONSUMER_1", "CONSUMER_2"})
+
+    def test_gaps_are_dropped_without_fill(self):
+        readings = _readings(2)
+        hourly = bucket_hourly(readings, ["Consumer"], ["Consumption"], fill_gaps=False)
+        metered = _resampled(readings.assign(Readings=1))
+        expected = (
+            metered[metered["Readings"] > 0]
+            .drop(columns="Readings")
+            .reset_index(drop=True)
+        )
+        pd.testing.assert_frame_equal(hourly, expected, check_exact=True)
+        self.assertLess(len(hourly), len(_resampled(readings)))
+
+    def test_readings_without_a_meter_give_no_rows(self):
+        readings = _readings(3)
+        readings["Consumer"] = None
+        hourly = bucket_hourly(readings, ["Consumer"], ["Consumption"])
+        self.assertTrue(hourly.empty)
+        self.assertEqual(
+            hourly.columns.tolist(), ["Consumer", "Datetime", "Consumption"]
+        )
+
+
+class CombineDateTimeTest(unittest.TestCase):
+    def assert_combines_to(self, dates: list, times: list, expected: list[str]):
+        index = pd.RangeIndex(10, 10 + len(dates))
+        combined = combine_date_time(
+            pd.Series(dates, index=index), pd.Series(times, index=index)
+        )
+        pd.testing.assert_series_equal(
+            combined,
+            pd.Series(
+                pd.to_datetime(expected, format="ISO8601"), index=index, name="Datetime"
+            ),
+        )
+
+    def test_excel_serials(self):
+        self.assert_combines_to(
+            [45292, 45292.0, 45293.75, 45294],
+            [0, 0.5, 0.25, 1439 / 1440],
+            [
+                "2024-01-01 00:00",
+                "2024-01-01 12:00",
+                "2024-01-02 06:00",
+                "2024-01-03 23:59",
+            ],
+        )
+
+    def test_datetime_and_time_cells(self):
+        day = dt.datetime(2024, 1, 1)
+        self.assert_combines_to(
+            [day, day, dt.date(2024, 1, 2), dt.datetime(2024, 1, 2, 8, 0)],
+            [
+                dt.time(0, 30),
+                dt.time(23, 59, 59),
+                dt.datetime(1899, 12, 30, 6, 15),
+                dt.time(1, 0),
+            ],
+            [
+                "2024-01-01 00:30",
+                "2024-01-01 23:59:59",
+                "2024-01-02 06:15",
+                "2024-01-02 01:00",
+            ],
+        )
+
+    def test_text_cells(self):
+        self.assert_combines_to(
+            ["2024-01-01", " 2024-01-01 ", "2024-01-02T00:00:00", "2024-01-02"],
+            ["13:30", " 07:15:30 ", "0:05", "23:00:00"],
+            [
+                "2024-01-01 13:30",
+                "2024-01-01 07:15:30",
+                "2024-01-02 00:05",
+                "2024-01-02 23:00",
+            ],
+        )
+
+    def test_matches_parsing_joined_text(self):
+        # How the loader combined the cells before: str() of both, joined.
+        day = dt.datetime(2024, 3, 31)
+        dates = pd.Series([day] * 48 + [day + dt.timedelta(days=1)] * 48)
+        times = pd.Series(
+            [dt.time(slot // 2, 30 * (slot % 2)) for slot in range(48)] * 2
+        )
+        pd.testing.assert_series_equal(
+            combine_date_time(dates, times),
+            pd.to_datetime(dates.astype(str) + " " + times.astype(str)).rename(
+                "Datetime"
+            ),
+        )
+
+
+class DeltaWorkbookTest(unittest.TestCase):
+    def test_left_out_sheets_give_empty_frames(self):
+        delta = EnergyDataLoader.load_from_excel(
+            _workbook("Load_Consumption", "Load_Register"), delta=True
+        )
+        self.assertTrue(delta.generations.empty)
+        self.assertTrue(delta.plant_consumer.empty)
+        self.assertEqual(len(delta.consumptions), 24)
+        self.assertEqual(delta.consumptions["Consumption"].sum(), 48.0)
+
+    def test_generation_without_its_register_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Generation_Register"):
+            EnergyDataLoader.load_from_excel(_workbook("Generation"), delta=True)
+
+    def test_generation_without_its_register_is_not_dropped(self):
+        # Readings that could not be named would otherwise vanish while the
+        # Load sheets beside them were appended.
+        workbook = _workbook("Generation", "Load_Consumption", "Load_Register")
+        with self.assertRaisesRegex(ValueError, "Generation_Register"):
+            EnergyDataLoader.load_from_excel(workbook, delta=True)
+
+    def test_consumption_without_its_register_is_rejected(self):
+        workbook = _workbook("Generation", "Generation_Register", "Load_Consumption")
+        with self.assertRaisesRegex(ValueError, "Load_Register"):
+            EnergyDataLoader.load_from_excel(workbook, delta=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
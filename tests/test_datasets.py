@@ -0,0 +1,223 @@
+import datetime as dt
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from callbacks import datasets
+from callbacks.data_loader import SHEET_COLUMNS, EnergyDataLoader, UploadedData
+from callbacks.datasets import Dataset
+from callbacks.parquet_cache import ParquetCache, content_digest
+from callbacks.partitions import partition_cache_info
+
+
+def _uploaded_data(seed: int, months: int = 3) -> UploadedData:
+    hours = pd.date_range("2024-01-01", periods=24 * 30 * months, freq="h")
+    rng = np.random.default_rng(seed)
+    plants = pd.DataFrame(
+        {
+            "Plant": ["PLANT_A", "PLANT_B"],
+            "Wholesale_Supplier": ["SUPPLIER_A", "SUPPLIER_B"],
+            "Gen_Mix": ["Hydro", "Solar"],
+        }
+    )
+    generations = plants.merge(pd.DataFrame({"Datetime": hours}), how="cross")
+    generations["Generation"] = rng.uniform(1, 50, size=len(generations))
+    generations["Gen_Consumption"] = rng.uniform(0, 1, size=len(generations))
+    consumptions = pd.DataFrame({"Consumer": ["CONSUMER_1", "CONSUMER_2"]}).merge(
+        pd.DataFrame({"Datetime": hours}), how="cross"
+    )
+    consumptions["Consumption"] = rng.uniform(1, 50, size=len(consumptions))
+    plant_consumer = pd.DataFrame(
+        {
+            "Plant": ["PLANT_A", "PLANT_A", "PLANT_B"],
+            "Consumer": ["CONSUMER_1", "CONSUMER_2", "CONSUMER_3"],
+            "Pct": [0.4, 0.5, 0.2],
+        }
+    )
+    return UploadedData(generations, consumptions, plant_consumer)
+
+
+def _workbook(
+    days: list[dt.date], restated: set = frozenset(), contracts: int | None = 0
+) -> bytes:
+    """
+    A settlement workbook with half-hourly readings of the given days.
+
+    Readings of `restated` days take other values. Without days the reading
+    and register sheets are left out, and `contracts` seeds the
+    Contract_Register, which is left out when None.
+    """
+
+    def reading(*key) -> float:
+        return (hash(key) % 1_000_003) * 50.0
+
+    names = [name for name in SHEET_COLUMNS if days and name != "Contract_Register"]
+    if contracts is not None:
+        names.append("Contract_Register")
+    workbook = Workbook(write_only=True)
+    sheets = {name: workbook.create_sheet(name) for name in names}
+    for name, sheet in sheets.items():
+        sheet.append(SHEET_COLUMNS[name])
+    for day in days:
+        version = day in restated
+        start = dt.datetime.combine(day, dt.time())
+        for slot in range(48):
+            time = (start + dt.timedelta(minutes=30 * slot)).time()
+            for meter in range(3):
+                key = (day.toordinal(), slot, meter, version)
+                sheets["Generation"].append(
+                    [start, time, reading(*key), reading(*key, 1) / 50, f"GM{meter}"]
+                )
+                sheets["Load_Consumption"].append(
+                    [start, time, reading(*key, 2) / 3, f"CM{meter}"]
+                )
+    for meter in range(3 if days else 0):
+        sheets["Generation_Register"].append(
+            [f"GM{meter}", f"PLANT_{meter}", f"SUPPLIER_{meter % 2}", "Hydro"]
+        )
+        sheets["Load_Register"].append([f"CM{meter}", f"CONSUMER_{meter}"])
+    if contracts is not None:
+        rng = np.random.default_rng(contracts)
+        for plant in range(3):
+            for consumer in range(4):
+                pct = round(float(rng.uniform(0, 0.3)), 3)
+                sheets["Contract_Register"].append(
+                    [f"PLANT_{plant}", f"CONSUMER_{consumer}", pct]
+                )
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _days(first: str, last: str) -> list[dt.date]:
+    return [day.date() for day in pd.date_range(first, last, freq="D")]
+
+
+class DatasetTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ParquetCache(directory.name, max_bytes=10**9)
+        patcher = mock.patch.object(datasets, "dataset_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def register(self, label: str, uploaded_data: UploadedData) -> Dataset:
+        digest = content_digest(f"{self.id()}:{label}".encode())
+        self.addCleanup(datasets._datasets.discard, digest)
+        return datasets.register_dataset(digest, uploaded_data)
+
+    def assert_same_dataset(self, dataset: Dataset, expected: Dataset):
+        self.assertEqual(dataset.months, expected.months)
+        self.assertEqual(dataset.consumers, expected.consumers)
+        pd.testing.assert_frame_equal(
+            dataset.generation_totals.totals, expected.generation_totals.totals
+        )
+        pd.testing.assert_frame_equal(
+            dataset.consumption_totals.totals, expected.consumption_totals.totals
+        )
+        for unit in ("D", "M"):
+            pd.testing.assert_frame_equal(
+                dataset.generation_rollup.levels[unit][1],
+                expected.generation_rollup.levels[unit][1],
+                check_categorical=False,
+            )
+        pd.testing.assert_frame_equal(
+            dataset.settlement_summary, expected.settlement_summary
+        )
+
+
+class ColdLoadTest(DatasetTestCase):
+    def test_cold_load_reads_stored_summaries_only(self):
+        dataset = self.register("base", _uploaded_data(1))
+        datasets._datasets.discard(dataset.id)
+
+        before = partition_cache_info()
+        loaded = datasets.get_dataset(dataset.id)
+        after = partition_cache_info()
+
+        self.assertIsNot(loaded, dataset)
+        self.assertEqual((after.hits, after.misses), (before.hits, before.misses))
+        rebuilt = Dataset(dataset.id, self.cache.get(dataset.id))
+        self.assert_same_dataset(loaded, rebuilt)
+
+
+class AppendDatasetTest(DatasetTestCase):
+    def assert_same_rows(self, dataset: Dataset, expected: Dataset):
+        start, end = expected.bounds
+        for table in ("generations", "consumptions"):
+            pd.testing.assert_frame_equal(
+                getattr(dataset, table).window(start, end).reset_index(drop=True),
+                getattr(expected, table).window(start, end).reset_index(drop=True),
+                check_categorical=False,
+            )
+
+    def test_append_matches_full_load_of_merged_workbook(self):
+        base = self.register(
+            "base",
+            EnergyDataLoader.load_from_excel(
+                _workbook(_days("2024-01-25", "2024-02-08"))
+            ),
+        )
+        # Restates 5-8 February and runs on into March.
+        delta = EnergyDataLoader.load_from_excel(
+            _workbook(
+                _days("2024-02-05", "2024-03-02"),
+                restated=set(_days("2024-02-05", "2024-02-08")),
+                contracts=None,
+            ),
+            delta=True,
+        )
+        appended, restated_hours = datasets.append_dataset(
+            base, content_digest(f"{self.id()}:appended".encode()), delta
+        )
+        self.addCleanup(datasets._datasets.discard, appended.id)
+        merged = self.register(
+            "merged",
+            EnergyDataLoader.load_from_excel(
+                _workbook(
+                    _days("2024-01-25", "2024-03-02"),
+                    restated=set(_days("2024-02-05", "2024-02-08")),
+                )
+            ),
+        )
+
+        self.assertEqual(restated_hours, 4 * 24)
+        self.assert_same_rows(appended, merged)
+        self.assert_same_dataset(appended, merged)
+        # January is untouched, so its summary is the base dataset's.
+        self.assertIs(appended.summaries["2024-01"], base.summaries["2024-01"])
+        self.assertIs(appended.settled["2024-01"], base.settled["2024-01"])
+
+    def test_appended_contracts_settle_every_month_again(self):
+        base = self.register(
+            "base",
+            EnergyDataLoader.load_from_excel(
+                _workbook(_days("2024-01-28", "2024-02-03"))
+            ),
+        )
+        delta = EnergyDataLoader.load_from_excel(_workbook([], contracts=7), delta=True)
+        appended, restated_hours = datasets.append_dataset(
+            base, content_digest(f"{self.id()}:appended".encode()), delta
+        )
+        self.addCleanup(datasets._datasets.discard, appended.id)
+        merged = self.register(
+            "merged",
+            EnergyDataLoader.load_from_excel(
+                _workbook(_days("2024-01-28", "2024-02-03"), contracts=7)
+            ),
+        )
+
+        self.assertEqual(restated_hours, 0)
+        self.assert_same_rows(appended, merged)
+        self.assert_same_dataset(appended, merged)
+        self.assertIs(appended.summaries["2024-01"], base.summaries["2024-01"])
+
+
+if __name__ == "__main__":
+    unittest.main()
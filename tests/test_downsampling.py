@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from callbacks.downsampling import downsample
+
+
+def _hourly(hours: int, seed: int, start: str = "2024-01-01") -> pd.Series:
+    index = pd.date_range(start, periods=hours, freq="h")
+    values = np.random.default_rng(seed).normal(size=hours).cumsum()
+    return pd.Series(values, index=index, name="Generation")
+
+
+class DownsampleTest(unittest.TestCase):
+    def test_short_span_keeps_every_hour_and_a_neighbour_each_side(self):
+        values = _hourly(100, seed=1)
+        start, end = values.index[10], values.index[40]
+        result = downsample(values, start, end, max_points=200)
+        pd.testing.assert_series_equal(result, values.iloc[9:42])
+
+    def test_bucket_minimum_and_maximum_are_kept(self):
+        values = _hourly(8760, seed=2)
+        start, end = values.index[0], values.index[-1]
+        result = downsample(values, start, end, max_points=500)
+
+        self.assertLessEqual(len(result), 500)
+        self.assertEqual(result.min(), values.min())
+        self.assertEqual(result.max(), values.max())
+        # Every point is a reading, and each pair is its bucket's min and max.
+        width = -(-len(values) // 250)
+        buckets = values.groupby(np.arange(len(values)) // width)
+        pairs = result.to_numpy().reshape(-1, 2)
+        np.testing.assert_array_equal(pairs.min(axis=1), buckets.min().to_numpy())
+        np.testing.assert_array_equal(pairs.max(axis=1), buckets.max().to_numpy())
+
+    def test_traces_share_the_x_grid(self):
+        generation = _hourly(8760, seed=3)
+        consumption = _hourly(8760, seed=4).rename("Consumption")
+        # A gap in one trace leaves whole buckets out, but no x value moves.
+        consumption = consumption.drop(consumption.index[1000:1100])
+        start, end = generation.index[0], generation.index[-1]
+
+        generation = downsample(generation, start, end, max_points=500)
+        consumption = downsample(consumption, start, end, max_points=500)
+        self.assertTrue(consumption.index.isin(generation.index).all())
+        self.assertTrue(generation.index.is_monotonic_increasing)
+
+    def test_grid_is_clipped_to_the_span(self):
+        values = _hourly(8760, seed=5)
+        start = pd.Timestamp("2024-01-03 10:30")
+        end = pd.Timestamp("2024-11-20 05:15")
+        result = downsample(values, start, end, max_points=500)
+
+        self.assertGreaterEqual(result.index.min(), start)
+        self.assertLessEqual(result.index.max(), end)
+        self.assertTrue(result.index.is_monotonic_increasing)
+        within = values[(values.index >= start) & (values.index <= end)]
+        self.assertEqual(result.max(), within.max())
+        self.assertEqual(result.min(), within.min())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import threading
+import time
+import unittest
+
+from callbacks.lru_cache import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_waiters_on_a_load_count_as_hits(self):
+        cache = LRUCache(4)
+        loads = []
+
+        def load():
+            loads.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        threads = [
+            threading.Thread(target=cache.get_or_load, args=("key", load))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        info = cache.info()
+        self.assertEqual(len(loads), 1)
+        self.assertEqual((info.hits, info.misses), (4, 1))
+
+    def test_none_is_not_cached(self):
+        cache = LRUCache(4)
+        self.assertIsNone(cache.get_or_load("key", lambda: None))
+        self.assertEqual(cache.get_or_load("key", lambda: "value"), "value")
+        self.assertEqual(cache.info().misses, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(cache.keys(), ["a", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from callbacks.data_loader import UploadedData
+from callbacks.parquet_cache import ParquetCache
+
+
+def _uploaded_data(seed: int, months: int = 3) -> UploadedData:
+    hours = pd.date_range("2024-01-01", periods=24 * 30 * months, freq="h")
+    rng = np.random.default_rng(seed)
+    generations = pd.DataFrame(
+        {
+            "Plant": "PLANT_A",
+            "Wholesale_Supplier": "SUPPLIER_A",
+            "Gen_Mix": "Hydro",
+            "Datetime": hours,
+            "Generation": rng.uniform(1, 50, size=len(hours)),
+            "Gen_Consumption": 0.0,
+        }
+    )
+    consumptions = pd.DataFrame(
+        {
+            "Consumer": "CONSUMER_A",
+            "Datetime": hours,
+            "Consumption": rng.uniform(1, 50, size=len(hours)),
+        }
+    )
+    plant_consumer = pd.DataFrame(
+        {"Plant": ["PLANT_A"], "Consumer": ["CONSUMER_A"], "Pct": [1.0]}
+    )
+    return UploadedData(generations, consumptions, plant_consumer)
+
+
+def _parquet_bytes(directory: Path) -> tuple[int, int]:
+    """Bytes of the distinct files under a directory, and of every link."""
+    sizes = {}
+    for path in directory.rglob("*.parquet"):
+        stat = path.stat()
+        sizes[stat.st_dev, stat.st_ino] = stat.st_size
+    linked = sum(path.stat().st_size for path in directory.rglob("*.parquet"))
+    return sum(sizes.values()), linked
+
+
+class ParquetCacheEvictionTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_pinned_entries_are_not_evicted(self):
+        cache = ParquetCache(self.directory, max_bytes=1)
+        cache.put("a" * 64, _uploaded_data(1))
+        cache.put("b" * 64, _uploaded_data(2), pinned=["a" * 64])
+        self.assertIsNotNone(cache.get("a" * 64))
+        self.assertIsNotNone(cache.get("b" * 64))
+
+        cache.put("c" * 64, _uploaded_data(3), pinned=["b" * 64])
+        self.assertIsNone(cache.get("a" * 64))
+        self.assertFalse(cache.touch("a" * 64))
+
+    def test_hardlinked_partitions_are_counted_once(self):
+        cache = ParquetCache(self.directory, max_bytes=10**9)
+        cache.put("a" * 64, _uploaded_data(1))
+        cache.put("b" * 64, _uploaded_data(2, months=1), base="a" * 64)
+        distinct, linked = _parquet_bytes(self.directory)
+        if distinct == linked:
+            self.skipTest("the cache directory does not support hardlinks")
+
+        cache.max_bytes = (distinct + linked) // 2
+        cache.evict()
+        self.assertIsNotNone(cache.get("a" * 64))
+        self.assertIsNotNone(cache.get("b" * 64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from callbacks.downsampling import data_span
+from callbacks.plant_generation_profiles import _build_chart, _patch_chart
+from callbacks.time_index import window_positions
+from callbacks.window_aggregates import window_plant_hours
+
+
+START, END = pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-29 23:00")
+
+# Plants by supplier; PLANT_SHARED sells through two suppliers.
+SUPPLIERS = {
+    "SUPPLIER_A": ["PLANT_A1", "PLANT_A2", "PLANT_SHARED"],
+    "SUPPLIER_B": ["PLANT_B1", "PLANT_B2"],
+    "SUPPLIER_C": ["PLANT_C1"],
+    "SUPPLIER_D": ["PLANT_D1", "PLANT_SHARED"],
+}
+
+
+class _Hours:
+    """Hourly generations answering `window` by binary search."""
+
+    def __init__(self, generations: pd.DataFrame):
+        self.generations = generations
+        self.times = generations["Datetime"].to_numpy(dtype="datetime64[ns]")
+
+    def window(self, start, end) -> pd.DataFrame:
+        lo, hi = window_positions(self.times, start, end)
+        return self.generations.iloc[lo:hi]
+
+
+def _dataset(dataset_id: str, seed: int) -> SimpleNamespace:
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range(START, END, freq="h")
+    pairs = pd.DataFrame(
+        [
+            (plant, supplier)
+            for supplier, plants in SUPPLIERS.items()
+            for plant in plants
+        ],
+        columns=["Plant", "Wholesale_Supplier"],
+    )
+    generations = pd.DataFrame({"Datetime": hours}).merge(pairs, how="cross")
+    # Plants differ in scale, so inserted traces land between kept ones.
+    scale = generations["Plant"].map(
+        {plant: rng.uniform(1, 10) for plant in pairs["Plant"]}
+    )
+    generations["Generation"] = scale * rng.uniform(0, 50, len(generations))
+    return SimpleNamespace(id=dataset_id, generations=_Hours(generations))
+
+
+def _traces(data: list) -> list:
+    """Trace dicts as the browser receives them."""
+    return json.loads(pio.to_json({"data": data}, validate=False))["data"]
+
+
+def _replay(data: list, patch) -> list:
+    """Apply the operations of a Patch to a figure's traces."""
+    data = list(data)
+    for operation in patch.to_plotly_json()["operations"]:
+        location, params = operation["location"], operation["params"]
+        if operation["operation"] == "Delete" and location[:1] == ["data"]:
+            del data[location[1]]
+        elif operation["operation"] == "Insert" and location == ["data"]:
+            data.insert(params["index"], params["value"])
+        else:
+            raise AssertionError(f"unexpected patch operation {operation}")
+    return data
+
+
+class PatchChartTest(unittest.TestCase):
+    def setUp(self):
+        self.dataset = _dataset(self.id(), seed=1)
+        self.plant_hours = window_plant_hours(self.dataset, START, END)
+
+    def figure(self, suppliers: list[str]) -> dict:
+        figures = _build_chart(self.dataset, suppliers, START, END)
+        return figures["plant_generation_profiles_figure"].to_dict()
+
+    def patched(self, shown_suppliers: list[str], suppliers: list[str]):
+        figure = self.figure(shown_suppliers)
+        shown = dict(
+            suppliers=shown_suppliers,
+            plants=[trace["name"] for trace in figure["data"]],
+        )
+        span = data_span(self.plant_hours["Datetime"])
+        return figure, _patch_chart(self.plant_hours, shown, suppliers, span)
+
+    def assert_patch_matches_rebuild(self, shown_suppliers, suppliers):
+        figure, patched = self.patched(shown_suppliers, suppliers)
+        self.assertIsNotNone(patched)
+        patch, plants = patched
+
+        rebuilt = self.figure(suppliers)["data"]
+        self.assertEqual(plants, [trace["name"] for trace in rebuilt])
+        self.assertEqual(_traces(_replay(figure["data"], patch)), _traces(rebuilt))
+
+    def test_adding_suppliers(self):
+        self.assert_patch_matches_rebuild(["SUPPLIER_B"], ["SUPPLIER_B", "SUPPLIER_C"])
+        self.assert_patch_matches_rebuild(
+            ["SUPPLIER_C"], ["SUPPLIER_A", "SUPPLIER_B", "SUPPLIER_C"]
+        )
+
+    def test_removing_suppliers(self):
+        self.assert_patch_matches_rebuild(
+            ["SUPPLIER_A", "SUPPLIER_B", "SUPPLIER_C"], ["SUPPLIER_B"]
+        )
+
+    def test_swapping_suppliers(self):
+        self.assert_patch_matches_rebuild(
+            ["SUPPLIER_B", "SUPPLIER_C"], ["SUPPLIER_A", "SUPPLIER_B"]
+        )
+
+    def test_plant_of_two_suppliers_takes_a_full_figure(self):
+        # PLANT_SHARED stays shown but its generation changes.
+        _, patched = self.patched(["SUPPLIER_A"], ["SUPPLIER_A", "SUPPLIER_D"])
+        self.assertIsNone(patched)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from callbacks.partitions import split_months
+from callbacks.rollups import DIMENSIONS, MEASURES, RollupCube, month_cells
+from callbacks.time_index import window_positions
+
+
+class _Hours:
+    """Hourly generations answering `window` by binary search."""
+
+    def __init__(self, generations: pd.DataFrame):
+        self.generations = generations
+        self.times = generations["Datetime"].to_numpy(dtype="datetime64[ns]")
+
+    def window(self, start, end) -> pd.DataFrame:
+        lo, hi = window_positions(self.times, start, end)
+        return self.generations.iloc[lo:hi]
+
+
+def _generations(seed: int) -> pd.DataFrame:
+    """Hourly generations of four plants over three months, with gaps."""
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2024-01-01", "2024-03-31 23:00", freq="h")
+    plants = pd.DataFrame(
+        {
+            "Plant": ["PLANT_A", "PLANT_B", "PLANT_C", "PLANT_D"],
+            "Wholesale_Supplier": ["SUPPLIER_A", "SUPPLIER_A", "SUPPLIER_B", None],
+            "Gen_Mix": ["Hydro", "Solar", "Solar", None],
+        }
+    )
+    generations = pd.DataFrame({"Datetime": hours}).merge(plants, how="cross")
+    generations["Generation"] = rng.uniform(0, 50, len(generations))
+    generations["Gen_Consumption"] = rng.uniform(0, 1, len(generations))
+    generations = generations[rng.random(len(generations)) > 0.1]
+    return generations.astype({column: "category" for column in DIMENSIONS})
+
+
+def _windows(seed: int, count: int) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Windows with arbitrary bounds, spanning hours to the whole data."""
+    rng = np.random.default_rng(seed)
+    first = pd.Timestamp("2023-12-28")
+    windows = []
+    for span in (3 * 60, 3 * 24 * 60, 45 * 24 * 60, 100 * 24 * 60):
+        starts = rng.integers(0, 95 * 24 * 60, count)
+        lengths = rng.integers(0, span, count)
+        windows += [
+            (
+                first + pd.Timedelta(minutes=int(start)),
+                first + pd.Timedelta(minutes=int(start + length)),
+            )
+            for start, length in zip(starts, lengths)
+        ]
+    return windows + [
+        (pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29 23:00")),
+        (pd.Timestamp("2024-02-10 05:20"), pd.Timestamp("2024-02-10 05:40")),
+    ]
+
+
+def _by_dimensions(frame: pd.DataFrame) -> pd.DataFrame:
+    return (
+        frame.groupby(DIMENSIONS, observed=True, dropna=False)[MEASURES]
+        .sum()
+        .sort_index()
+    )
+
+
+class RollupCubeTest(unittest.TestCase):
+    def test_window_cells_match_masked_sums(self):
+        generations = _generations(1).reset_index(drop=True)
+        cube = RollupCube(
+            _Hours(generations),
+            [month_cells(month) for month in split_months(generations).values()],
+        )
+
+        for start, end in _windows(2, count=25):
+            inside = (generations["Datetime"] >= start) & (
+                generations["Datetime"] <= end
+            )
+            expected = _by_dimensions(generations[inside])
+            cells = _by_dimensions(cube.window_cells(start, end))
+            pd.testing.assert_frame_equal(
+                cells,
+                expected,
+                check_exact=False,
+                rtol=1e-9,
+                obj=f"cells over {start} - {end}",
+            )
+
+    def test_cells_lie_inside_the_window(self):
+        generations = _generations(3).reset_index(drop=True)
+        cube = RollupCube(
+            _Hours(generations),
+            [month_cells(month) for month in split_months(generations).values()],
+        )
+        start, end = pd.Timestamp("2024-01-30 07:15"), pd.Timestamp("2024-03-02 18:00")
+        cells = cube.window_cells(start, end)
+        self.assertGreaterEqual(cells["Datetime"].min(), start.ceil("h"))
+        self.assertLessEqual(cells["Datetime"].max(), end)
+        # Whole February comes from one month cell per plant.
+        self.assertIn(pd.Timestamp("2024-02-01"), set(cells["Datetime"]))
+        self.assertLess(len(cells), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from callbacks.time_index import PrefixSums
+
+
+def _readings(seed: int) -> pd.DataFrame:
+    """Hourly readings of three plants over three months, with gaps."""
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2024-01-01", "2024-03-31 23:00", freq="h")
+    readings = pd.DataFrame(
+        {
+            "Plant": np.repeat(["PLANT_A", "PLANT_B", "PLANT_C"], len(hours)),
+            "Datetime": np.tile(hours, 3),
+            "Generation": rng.uniform(0, 50, 3 * len(hours)),
+            "Gen_Consumption": rng.uniform(0, 1, 3 * len(hours)),
+        }
+    )
+    return readings[rng.random(len(readings)) > 0.1].reset_index(drop=True)
+
+
+def _random_windows(seed: int, count: int) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Windows with arbitrary bounds, some reaching past the data or empty."""
+    rng = np.random.default_rng(seed)
+    first = pd.Timestamp("2023-12-25")
+    minutes = rng.integers(0, 110 * 24 * 60, size=(count, 2))
+    windows = [
+        (first + pd.Timedelta(minutes=int(a)), first + pd.Timedelta(minutes=int(b)))
+        for a, b in np.sort(minutes, axis=1)
+    ]
+    return windows + [
+        (pd.Timestamp("2024-02-10 05:00"), pd.Timestamp("2024-02-10 05:00")),
+        (pd.Timestamp("2024-02-10 06:00"), pd.Timestamp("2024-02-10 05:00")),
+        (pd.Timestamp("2020-01-01"), pd.Timestamp("2030-01-01")),
+    ]
+
+
+class PrefixSumsTest(unittest.TestCase):
+    def test_window_sums_match_masked_sums(self):
+        readings = _readings(1)
+        columns = ["Generation", "Gen_Consumption"]
+        totals = PrefixSums(readings, columns)
+
+        for start, end in _random_windows(2, count=200):
+            inside = (readings["Datetime"] >= start) & (readings["Datetime"] <= end)
+            for column in columns:
+                expected = readings.loc[inside, column].sum()
+                self.assertAlmostEqual(
+                    totals.sum(column, start, end),
+                    expected,
+                    delta=1e-9 * max(1.0, abs(expected)),
+                    msg=f"{column} over {start} - {end}",
+                )
+
+    def test_window_rows_are_hourly_totals(self):
+        readings = _readings(3)
+        totals = PrefixSums(readings, ["Generation"])
+        start, end = pd.Timestamp("2024-01-31 22:30"), pd.Timestamp("2024-02-02")
+
+        inside = readings[
+            (readings["Datetime"] >= start) & (readings["Datetime"] <= end)
+        ]
+        expected = inside.groupby("Datetime")[["Generation"]].sum()
+        pd.testing.assert_frame_equal(totals.window(start, end), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import dash_mantine_components as dmc
+import plotly.io as pio
 
 generation_analysis_ui = [
     dbc.Row(
@@ -36,6 +37,13 @@ generation_analysis_ui = [
                 lg=6,
                 md=12,
             ),
+            dcc.Store(id="gen-mix-ipps-store"),
+            # Sent once with the layout; the gen mix charts are built in the
+            # browser and only their sums change with the window.
+            dcc.Store(
+                id="plotly-template-store",
+                data=pio.templates[pio.templates.default].to_plotly_json(),
+            ),
         ],
         className="mb-3",
     ),
@@ -102,7 +110,9 @@ generation_analysis_ui = [
                     dcc.Graph(
                         id="plant-generation-profiles-chart",
                         config={"displaylogo": False},
-                    )
+                    ),
+                    dcc.Store(id="plant-generation-profiles-store"),
+                    dcc.Store(id="plant-generation-profiles-shown"),
                 ]
             ),
         ],
@@ -3,6 +3,7 @@ Upload section UI component.
 Provides the interface for uploading Excel files containing energy data.
 """
 from dash import html, dcc
+import dash_bootstrap_components as dbc
 
 
 upload_section_ui = html.Div(
@@ -43,6 +44,14 @@ upload_section_ui = html.Div(
                 style={"margin-top": "3rem", "text-align": "center"},
             ),
         ),
+        html.Div(
+            dbc.Progress(id="upload-progress-bar", striped=True, animated=True),
+            id="upload-progress",
+            className="hidden",
+            style={"margin-top": "1.5rem"},
+        ),
+        dcc.Store(id="upload-job-store"),
+        dcc.Interval(id="upload-job-poll", interval=500, disabled=True),
     ],
     id="upload-section",
     className="data-card",